@@ -1,10 +1,14 @@
 import base64
+import heapq
 import json
 import random
 import re
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any, List, Dict, Tuple, Optional, Union, Set
 from urllib.parse import urlparse, parse_qs, unquote, parse_qsl, urlencode, urlunparse
 
@@ -25,6 +29,7 @@ from app.log import logger
 from app.modules.qbittorrent import Qbittorrent
 from app.modules.transmission import Transmission
 from app.plugins import _PluginBase
+from app.plugins.brushflow.task_store import BrushTaskStore
 from app.schemas import NotificationType, TorrentInfo, MediaType, ServiceInfo
 from app.schemas.types import EventType
 from app.utils.http import RequestUtils
@@ -37,6 +42,8 @@ class BrushConfig:
     """
     刷流配置
     """
+    # 由配置预编译的过滤条件，不参与站点独立配置的合并及输出
+    _compiled_fields = ("include_regex", "exclude_regex", "size_range", "seeder_range", "pubtime_range")
 
     def __init__(self, config: dict, process_site_config=True):
         self.enabled = config.get("enabled", False)
@@ -73,6 +80,7 @@ class BrushConfig:
         self.except_subscribe = config.get("except_subscribe", True)
         self.brush_sequential = config.get("brush_sequential", False)
         self.proxy_delete = config.get("proxy_delete", False)
+        self.proxy_delete_dry_run = config.get("proxy_delete_dry_run", False)
         self.del_no_free = config.get("del_no_free", False) if self.freeleech in ["free", "2xfree"] else False
         self.active_time_range = config.get("active_time_range")
         self.cron = config.get("cron")
@@ -81,6 +89,14 @@ class BrushConfig:
         self.site_skip_tips = config.get("site_skip_tips", False)
 
         self.brush_tag = "刷流"
+
+        # 预编译过滤条件，刷流时不再逐个种子解析
+        self.include_regex = self.__compile_regex(self.include, "包含规则")
+        self.exclude_regex = self.__compile_regex(self.exclude, "排除规则")
+        self.size_range = self.__parse_range(self.size, 1024 ** 3)
+        self.seeder_range = self.__parse_range(self.seeder)
+        self.pubtime_range = self.__parse_range(self.pubtime)
+
         # 站点独立配置
         self.enable_site_config = config.get("enable_site_config", False)
         self.site_config = config.get("site_config", "[]")
@@ -140,7 +156,7 @@ class BrushConfig:
                 site_specific_config = {key: config[key] for key in allowed_fields & set(config.keys())}
 
                 full_config = {key: getattr(self, key) for key in vars(self) if
-                               key not in ["group_site_configs", "site_config"]}
+                               key not in ["group_site_configs", "site_config", *self._compiled_fields]}
                 full_config.update(site_specific_config)
 
                 self.group_site_configs[sitename] = BrushConfig(config=full_config, process_site_config=False)
@@ -205,6 +221,32 @@ class BrushConfig:
             return self
         return self if not sitename else self.group_site_configs.get(sitename, self)
 
+    @staticmethod
+    def __compile_regex(pattern: Optional[str], desc: str) -> Optional[re.Pattern]:
+        """
+        编译包含/排除规则，规则错误时不匹配任何种子
+        """
+        if not pattern:
+            return None
+        try:
+            return re.compile(pattern, re.I)
+        except re.error as e:
+            logger.error(f"{desc} {pattern} 格式错误，将不会刷流任何种子，错误详情: {e}")
+            return re.compile(r"(?!)") if desc == "包含规则" else re.compile(r"")
+
+    @staticmethod
+    def __parse_range(value: Any, scale: float = 1) -> Optional[Tuple[float, Optional[float]]]:
+        """
+        解析数字或数字范围（如'5'、'5-10'），返回下限及上限，单个数字时上限为None
+        """
+        if value is None or value == "":
+            return None
+        try:
+            numbers = [float(n) * scale for n in str(value).split("-")]
+        except ValueError:
+            return None
+        return numbers[0], numbers[1] if len(numbers) > 1 else None
+
     @staticmethod
     def __parse_number(value):
         if value is None or value == "":  # 更精确地检查None或空字符串
@@ -240,7 +282,7 @@ class BrushConfig:
             return str(v)
 
     def __str__(self):
-        attrs = vars(self)
+        attrs = {k: v for k, v in vars(self).items() if k not in self._compiled_fields}
         # Note the use of self.format_value(v) here to call the instance method
         attrs_str = ', '.join(f'"{k}": {self.__format_value(v)}' for k, v in attrs.items())
         return f'{{ {attrs_str} }}'
@@ -249,6 +291,110 @@ class BrushConfig:
         return self.__str__()
 
 
+class BrushTaskIndex:
+    """
+    刷流任务索引，按站点+标题、站点+详情地址、标题建立索引，用于重复种子判断
+    每次刷流时根据当前任务构建，刷流期间新增的任务同步加入，删除及归档在检查任务中处理，不会与刷流同时进行
+    """
+
+    def __init__(self, torrent_tasks: Dict[str, dict] = None):
+        # {(站点名称, 标题)}
+        self._title_keys: Set[Tuple[Any, Any]] = set()
+        # {(站点名称, 详情地址)}
+        self._page_url_keys: Set[Tuple[Any, Any]] = set()
+        # {标题: {尚未做种的站点名称}}
+        self._unseeded_titles: Dict[Any, Set[Any]] = {}
+        for task in (torrent_tasks or {}).values():
+            self.add(task)
+
+    def add(self, task: dict):
+        """
+        添加任务到索引
+        """
+        site_name, title = task.get("site_name"), task.get("title")
+        self._title_keys.add((site_name, title))
+        if task.get("page_url"):
+            self._page_url_keys.add((site_name, task.get("page_url")))
+        if not task.get("seed_time"):
+            self._unseeded_titles.setdefault(title, set()).add(site_name)
+
+    def contains_title(self, site_name: str, title: str) -> bool:
+        """
+        站点是否已存在相同标题的任务
+        """
+        return (site_name, title) in self._title_keys
+
+    def contains_page_url(self, site_name: str, page_url: str) -> bool:
+        """
+        站点是否已存在相同详情地址的任务
+        """
+        return (site_name, page_url) in self._page_url_keys
+
+    def contains_unseeded_title(self, site_name: str, title: str) -> bool:
+        """
+        其他站点是否存在尚未做种的相同标题任务
+        """
+        sites = self._unseeded_titles.get(title)
+        return bool(sites) and (len(sites) > 1 or site_name not in sites)
+
+
+class SubscribeTitleMatcher:
+    """
+    订阅标题多模式匹配，基于Aho-Corasick自动机，单次扫描文本即可判断是否包含任一订阅标题
+    """
+
+    def __init__(self, titles: Set[str]):
+        # 与逐个判断子串一致，空标题会命中任意文本
+        self.titles = frozenset(title for title in titles if title is not None)
+        # 状态转移表、失败指针及每个状态命中的标题
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Optional[str]] = [None]
+        for title in self.titles:
+            state = 0
+            for char in title:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(None)
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state] = title
+        # 按层构建失败指针，并继承失败状态的命中标题
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail_state = self._fail[state]
+                while fail_state and char not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._goto[fail_state].get(char, 0)
+                if self._output[next_state] is None:
+                    self._output[next_state] = self._output[self._fail[next_state]]
+
+    def __bool__(self) -> bool:
+        return bool(self.titles)
+
+    def search(self, text: str) -> Optional[str]:
+        """
+        查找文本中包含的订阅标题，未命中返回None
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        if output[0] is not None:
+            return output[0]
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+
 class BrushFlow(_PluginBase):
     # region 全局定义
 
@@ -259,7 +405,7 @@ class BrushFlow(_PluginBase):
     # 插件图标
     plugin_icon = "brush.jpg"
     # 插件版本
-    plugin_version = "4.3.3"
+    plugin_version = "4.3.12"
     # 插件作者
     plugin_author = "jxxghp,InfinityPacer"
     # 作者主页
@@ -277,6 +423,23 @@ class BrushFlow(_PluginBase):
     _task_brush_enable = False
     # 订阅缓存信息
     _subscribe_infos = None
+    # 订阅标题匹配器，订阅标题变化时重建
+    _subscribe_matcher = None
+    # 刷流任务存储
+    _task_store = None
+    # 同时获取种子列表的站点数
+    _browse_workers = 4
+    # 统计历史保留的小时数
+    _statistic_history_hours = 7 * 24
+    # 插件页面展示的最近任务数
+    _page_task_limit = 200
+    # 带宽采样线程及退出事件
+    _bandwidth_sampler = None
+    _bandwidth_event = threading.Event()
+    # 最近的带宽采样，(采样时间, 上传速度, 下载速度)
+    _bandwidth_samples = deque(maxlen=200)
+    # 带宽采样间隔（秒）
+    _bandwidth_interval = 15
     # Brush定时
     _brush_interval = 10
     # Check定时
@@ -299,6 +462,10 @@ class BrushFlow(_PluginBase):
 
         self._tabs = config.get("_tabs", None)
 
+        if not self._task_store:
+            self._task_store = BrushTaskStore(self.get_data_path() / "brush_tasks.db")
+            self.__migrate_task_data()
+
         # 如果配置校验没有通过，那么这里修改配置文件后退出
         if not self.__validate_and_fix_config(config=config):
             self._brush_config = BrushConfig(config=config)
@@ -350,6 +517,10 @@ class BrushFlow(_PluginBase):
         if not self.service_info:
             return
 
+        # 设置了总带宽限制时后台持续采样带宽，刷流前置条件直接读取平均值
+        if self._task_brush_enable and (brush_config.maxupspeed or brush_config.maxdlspeed):
+            self.__start_bandwidth_sampler()
+
         # 检查是否启用了一次性任务
         if brush_config.onlyonce:
             self._scheduler = BackgroundScheduler(timezone=settings.TZ)
@@ -468,6 +639,79 @@ class BrushFlow(_PluginBase):
 
         return services
 
+    def __get_delete_plan_elements(self) -> List[dict]:
+        """
+        组装动态删种预演计划元素
+        """
+        brush_config = self.__get_brush_config()
+        if not brush_config or not (brush_config.proxy_delete and brush_config.proxy_delete_dry_run):
+            return []
+
+        delete_plan = self.get_data("delete_plan")
+        if not delete_plan:
+            return []
+
+        plan_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(delete_plan.get("time") or 0))
+        items = delete_plan.get("items") or []
+        summary = (f"动态删种预演（{plan_time}）：计划删除 {len(items)} 个种子，"
+                   f"预计释放 {StringUtils.str_filesize(delete_plan.get('freed_size') or 0)}，"
+                   f"做种体积 {StringUtils.str_filesize(delete_plan.get('origin_size') or 0)} → "
+                   f"{StringUtils.str_filesize(delete_plan.get('remaining_size') or 0)}")
+
+        headers = [
+            {'title': '站点', 'key': 'site', 'sortable': True},
+            {'title': '标题', 'key': 'title', 'sortable': True},
+            {'title': '大小', 'key': 'size', 'sortable': True},
+            {'title': '平均上传速度', 'key': 'avg_upspeed', 'sortable': True},
+            {'title': '做种时间', 'key': 'seeding_time', 'sortable': True},
+            {'title': '删除原因', 'key': 'stage', 'sortable': True},
+        ]
+        rows = [
+            {
+                'site': item.get("site_name"),
+                'title': item.get("title"),
+                'size': StringUtils.str_filesize(item.get("size") or 0),
+                'avg_upspeed': f"{StringUtils.str_filesize(item.get('avg_upspeed') or 0)}/s",
+                'seeding_time': f"{(item.get('seeding_time') or 0) / 3600:.1f} 小时",
+                'stage': item.get("stage")
+            } for item in items
+        ]
+
+        content = [
+            {
+                'component': 'VAlert',
+                'props': {
+                    'type': 'info',
+                    'variant': 'tonal',
+                    'text': summary
+                }
+            }
+        ]
+        if rows:
+            content.append({
+                'component': 'VDataTableVirtual',
+                'props': {
+                    'class': 'text-sm',
+                    'headers': headers,
+                    'items': rows,
+                    'height': '20rem',
+                    'density': 'compact',
+                    'fixed-header': True,
+                    'hide-no-data': True,
+                    'hover': True
+                }
+            })
+
+        return [
+            {
+                'component': 'VCol',
+                'props': {
+                    'cols': 12,
+                },
+                'content': content
+            }
+        ]
+
     def __get_total_elements(self) -> List[dict]:
         """
         组装汇总元素
@@ -792,16 +1036,155 @@ class BrushFlow(_PluginBase):
             "cols": 12
         }
         # 全局配置
-        attrs = {}
+        attrs = {
+            "refresh": 30
+        }
         # 拼装页面元素
         elements = [
             {
                 'component': 'VRow',
                 'content': self.__get_total_elements()
+            },
+            {
+                'component': 'VRow',
+                'content': self.__get_bandwidth_elements()
             }
         ]
         return cols, attrs, elements
 
+    def __get_bandwidth_elements(self) -> List[dict]:
+        """
+        组装最近的带宽采样图表，未设置总带宽限制不采样时不展示
+        """
+        samples = list(self._bandwidth_samples)
+        if not samples:
+            return []
+        categories = [datetime.fromtimestamp(sample[0]).strftime("%H:%M:%S") for sample in samples]
+        upload_speeds = [round(sample[1] / 1024, 1) for sample in samples]
+        download_speeds = [round(sample[2] / 1024, 1) for sample in samples]
+        return [
+            {
+                'component': 'VCol',
+                'props': {
+                    'cols': 12
+                },
+                'content': [
+                    {
+                        'component': 'VApexChart',
+                        'props': {
+                            'height': 300,
+                            'options': {
+                                'chart': {
+                                    'type': 'line',
+                                    'toolbar': {
+                                        'show': False
+                                    }
+                                },
+                                'title': {
+                                    'text': '最近带宽（KB/s）'
+                                },
+                                'stroke': {
+                                    'curve': 'smooth',
+                                    'width': 2
+                                },
+                                'xaxis': {
+                                    'categories': categories,
+                                    'tickAmount': 10
+                                },
+                                'legend': {
+                                    'show': True
+                                },
+                                'noData': {
+                                    'text': '暂无数据'
+                                }
+                            },
+                            'series': [
+                                {
+                                    'name': '上传',
+                                    'data': upload_speeds
+                                },
+                                {
+                                    'name': '下载',
+                                    'data': download_speeds
+                                }
+                            ]
+                        }
+                    }
+                ]
+            }
+        ]
+
+    def __get_site_trend_elements(self, site_limit: int = 10) -> List[dict]:
+        """
+        组装各站点每小时上传量趋势图表，只展示上传量最多的站点
+        """
+        history = self.get_data("statistic_history") or []
+        if len(history) < 2:
+            return []
+
+        categories = []
+        site_series: Dict[str, List[float]] = {}
+        for index, (previous, current) in enumerate(zip(history, history[1:])):
+            categories.append(datetime.fromtimestamp(current.get("time")).strftime("%m-%d %H:00"))
+            previous_sites = previous.get("sites") or {}
+            for site_name, uploaded in (current.get("sites") or {}).items():
+                # 累计数据可能因清除统计或归档重复任务而减少，此时按0处理
+                delta = max(uploaded - previous_sites.get(site_name, uploaded), 0)
+                site_series.setdefault(site_name, [0.0] * index)
+                site_series[site_name].append(round(delta / 1024 ** 3, 2))
+            for values in site_series.values():
+                if len(values) <= index:
+                    values.append(0.0)
+
+        top_sites = sorted(site_series.items(), key=lambda x: sum(x[1]), reverse=True)[:site_limit]
+        return [
+            {
+                'component': 'VCol',
+                'props': {
+                    'cols': 12
+                },
+                'content': [
+                    {
+                        'component': 'VApexChart',
+                        'props': {
+                            'height': 300,
+                            'options': {
+                                'chart': {
+                                    'type': 'line',
+                                    'toolbar': {
+                                        'show': False
+                                    }
+                                },
+                                'title': {
+                                    'text': '站点每小时上传量（GB）'
+                                },
+                                'stroke': {
+                                    'curve': 'smooth',
+                                    'width': 2
+                                },
+                                'xaxis': {
+                                    'categories': categories,
+                                    'tickAmount': 12
+                                },
+                                'legend': {
+                                    'show': True
+                                },
+                                'noData': {
+                                    'text': '暂无数据'
+                                }
+                            },
+                            'series': [
+                                {
+                                    'name': site_name or '未知站点',
+                                    'data': values
+                                } for site_name, values in top_sites
+                            ]
+                        }
+                    }
+                ]
+            }
+        ]
+
     def get_form(self) -> Tuple[List[dict], Dict[str, Any]]:
         """
         拼装插件配置页面，需要返回两块数据：1、页面配置；2、数据结构
@@ -1638,6 +2021,22 @@ class BrushFlow(_PluginBase):
                                                         }
                                                     }
                                                 ]
+                                            },
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VSwitch',
+                                                        'props': {
+                                                            'model': 'proxy_delete_dry_run',
+                                                            'label': '动态删种预演（仅展示计划不删除）',
+                                                        }
+                                                    }
+                                                ]
                                             }
                                         ]
                                     }
@@ -1813,6 +2212,7 @@ class BrushFlow(_PluginBase):
             "except_subscribe": True,
             "brush_sequential": False,
             "proxy_delete": False,
+            "proxy_delete_dry_run": False,
             "del_no_free": False,
             "freeleech": "free",
             "hr": "yes",
@@ -1821,8 +2221,8 @@ class BrushFlow(_PluginBase):
         }
 
     def get_page(self) -> List[dict]:
-        # 种子明细
-        torrents = self.get_data("torrents") or {}
+        # 种子明细，只展示最近添加的任务
+        torrents = self._task_store.recent("torrents", limit=self._page_task_limit) if self._task_store else []
 
         if not torrents:
             return [
@@ -1835,9 +2235,7 @@ class BrushFlow(_PluginBase):
                 }
             ]
         else:
-            data_list = torrents.values()
-            # 按time倒序排序
-            data_list = sorted(data_list, key=lambda x: x.get("time") or 0, reverse=True)
+            data_list = torrents
 
         # 表格标题
         headers = [
@@ -1871,7 +2269,8 @@ class BrushFlow(_PluginBase):
                         'overflow': 'hidden',
                     }
                 },
-                'content': self.__get_total_elements() + [
+                'content': self.__get_total_elements() + self.__get_site_trend_elements()
+                           + self.__get_delete_plan_elements() + [
                     # 种子明细
                     {
                         'component': 'VRow',
@@ -1910,6 +2309,7 @@ class BrushFlow(_PluginBase):
         """
         退出插件
         """
+        self.__stop_bandwidth_sampler()
         try:
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
@@ -1939,7 +2339,7 @@ class BrushFlow(_PluginBase):
         with lock:
             logger.info(f"开始执行刷流任务 ...")
 
-            torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
+            torrent_tasks: Dict[str, dict] = self._task_store.load("torrents")
             torrents_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
 
             # 判断能否通过保种体积前置条件
@@ -1949,8 +2349,12 @@ class BrushFlow(_PluginBase):
                 logger.info(f"刷流任务执行完成")
                 return
 
+            # 本轮刷流开始时获取一次下载中的刷流任务，新增任务后在本地更新，不再逐个种子查询下载器
+            downloading_hashes = self.__get_downloading_hashes()
+
             # 判断能否通过刷流前置条件
-            pre_condition_passed, reason = self.__evaluate_pre_conditions_for_brush()
+            pre_condition_passed, reason = self.__evaluate_pre_conditions_for_brush(
+                downloading_hashes=downloading_hashes)
             self.__log_brush_conditions(passed=pre_condition_passed, reason=reason)
             if not pre_condition_passed:
                 logger.info(f"刷流任务执行完成")
@@ -1972,61 +2376,93 @@ class BrushFlow(_PluginBase):
             logger.info(f"即将针对站点 {', '.join(site.name for site in site_infos)} 开始刷流")
 
             # 获取订阅标题
-            subscribe_titles = self.__get_subscribe_titles()
-
-            # 处理所有站点
-            for site in site_infos:
-                # 如果站点刷流没有正确响应，说明没有通过前置条件，其他站点也不需要继续刷流了
-                if not self.__brush_site_torrents(siteid=site.id, torrent_tasks=torrent_tasks,
-                                                  statistic_info=statistic_info,
-                                                  subscribe_titles=subscribe_titles):
-                    logger.info(f"站点 {site.name} 刷流中途结束，停止后续刷流")
-                    break
-                else:
-                    logger.info(f"站点 {site.name} 刷流完成")
+            subscribe_matcher = self.__get_subscribe_matcher()
+
+            # 重复种子判断索引，新增任务时同步更新
+            task_index = BrushTaskIndex(torrent_tasks)
+
+            # 并发获取所有站点的种子，按优先级合并后统一刷流
+            candidates = self.__fetch_sites_torrents(site_infos=site_infos, subscribe_matcher=subscribe_matcher)
+            # 如果刷流没有正确响应，说明没有通过前置条件，其他种子也不需要继续刷流了
+            if not self.__brush_site_torrents(candidates=candidates, torrent_tasks=torrent_tasks,
+                                              statistic_info=statistic_info,
+                                              downloading_hashes=downloading_hashes,
+                                              task_index=task_index):
+                logger.info(f"刷流中途结束，停止后续刷流")
 
             # 保存数据
-            self.save_data("torrents", torrent_tasks)
+            self._task_store.save("torrents", torrent_tasks)
             # 保存统计数据
             self.save_data("statistic", statistic_info)
             logger.info(f"刷流任务执行完成")
 
-    def __brush_site_torrents(self, siteid, torrent_tasks: Dict[str, dict], statistic_info: Dict[str, int],
-                              subscribe_titles: Set[str]) -> bool:
+    def __fetch_sites_torrents(self, site_infos: List[Any],
+                               subscribe_matcher: SubscribeTitleMatcher) -> List[Tuple[tuple, int, Any, TorrentInfo]]:
         """
-        针对站点进行刷流
+        并发获取各站点的新种子，合并为按优先级排列的堆
+        优先级：顺序刷流时先按站点顺序，再按发布时间由新到旧，做种人数由少到多
         """
-        siteinfo = SiteOper().get(siteid)
-        if not siteinfo:
-            logger.warning(f"站点不存在：{siteid}")
-            return True
+        brush_config = self.__get_brush_config()
+        candidates = []
+        if not site_infos:
+            return candidates
+
+        def __browse(_siteinfo: Any) -> List[TorrentInfo]:
+            logger.info(f"开始获取站点 {_siteinfo.name} 的新种子 ...")
+            return TorrentsChain().browse(domain=_siteinfo.domain) or []
+
+        with ThreadPoolExecutor(max_workers=min(self._browse_workers, len(site_infos))) as executor:
+            futures = {executor.submit(__browse, siteinfo): (site_order, siteinfo)
+                       for site_order, siteinfo in enumerate(site_infos)}
+            for future in as_completed(futures):
+                site_order, siteinfo = futures[future]
+                try:
+                    torrents = future.result()
+                except Exception as e:
+                    logger.error(f"获取站点 {siteinfo.name} 的新种子失败：{e}")
+                    continue
+                if not torrents:
+                    logger.info(f"站点 {siteinfo.name} 没有获取到种子")
+                    continue
 
-        logger.info(f"开始获取站点 {siteinfo.name} 的新种子 ...")
-        torrents = TorrentsChain().browse(domain=siteinfo.domain)
-        if not torrents:
-            logger.info(f"站点 {siteinfo.name} 没有获取到种子")
-            return True
+                site_config = self.__get_brush_config(sitename=siteinfo.name)
 
-        brush_config = self.__get_brush_config(sitename=siteinfo.name)
+                if site_config.site_hr_active:
+                    logger.info(f"站点 {siteinfo.name} 已开启全站H&R选项，所有种子设置为H&R种子")
 
-        if brush_config.site_hr_active:
-            logger.info(f"站点 {siteinfo.name} 已开启全站H&R选项，所有种子设置为H&R种子")
+                # 排除包含订阅的种子
+                if site_config.except_subscribe:
+                    torrents = self.__filter_torrents_contains_subscribe(torrents=torrents,
+                                                                         subscribe_matcher=subscribe_matcher)
 
-        # 排除包含订阅的种子
-        if brush_config.except_subscribe:
-            torrents = self.__filter_torrents_contains_subscribe(torrents=torrents, subscribe_titles=subscribe_titles)
+                logger.info(f"站点 {siteinfo.name} 获取到种子数量 {len(torrents)}")
+                site_rank = site_order if brush_config.brush_sequential else 0
+                for torrent in torrents:
+                    pub_minutes = self.__get_sort_pubminutes(torrent.pubdate) - site_config.timezone_offset
+                    priority = (site_rank, pub_minutes, torrent.seeders or 0)
+                    candidates.append((priority, len(candidates), siteinfo, torrent))
 
-        # 按发布日期降序排列
-        torrents.sort(key=lambda x: x.pubdate or '', reverse=True)
+        heapq.heapify(candidates)
+        return candidates
 
+    def __brush_site_torrents(self, candidates: List[Tuple[tuple, int, Any, TorrentInfo]],
+                              torrent_tasks: Dict[str, dict], statistic_info: Dict[str, int],
+                              downloading_hashes: Set[str], task_index: BrushTaskIndex) -> bool:
+        """
+        按优先级依次对各站点的种子进行刷流，共用保种体积及同时下载数限制
+        """
         torrents_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
 
-        logger.info(f"正在准备种子刷流，数量 {len(torrents)}")
+        logger.info(f"正在准备种子刷流，数量 {len(candidates)}")
 
         # 过滤种子
-        for torrent in torrents:
+        while candidates:
+            _, _, siteinfo, torrent = heapq.heappop(candidates)
+            brush_config = self.__get_brush_config(sitename=siteinfo.name)
+
             # 判断能否通过刷流前置条件
-            pre_condition_passed, reason = self.__evaluate_pre_conditions_for_brush(include_network_conditions=False)
+            pre_condition_passed, reason = self.__evaluate_pre_conditions_for_brush(
+                include_network_conditions=False, downloading_hashes=downloading_hashes)
             self.__log_brush_conditions(passed=pre_condition_passed, reason=reason)
             if not pre_condition_passed:
                 return False
@@ -2042,7 +2478,7 @@ class BrushFlow(_PluginBase):
 
             # 判断能否通过刷流条件
             condition_passed, reason = self.__evaluate_conditions_for_brush(torrent=torrent,
-                                                                            torrent_tasks=torrent_tasks)
+                                                                            task_index=task_index)
             self.__log_brush_conditions(passed=condition_passed, reason=reason, torrent=torrent)
             if not condition_passed:
                 continue
@@ -2097,6 +2533,8 @@ class BrushFlow(_PluginBase):
                 "downloader": self.service_info.name
             })
             torrent_tasks[hash_string] = torrent_task
+            task_index.add(torrent_task)
+            downloading_hashes.add(hash_string)
 
             # 统计数据
             torrents_size += torrent.size
@@ -2115,9 +2553,8 @@ class BrushFlow(_PluginBase):
 
         # 如果没有明确指定增加的种子大小，则检查配置中是否有种子大小下限，如果有，使用这个大小作为增加的种子大小
         preset_condition = False
-        if not add_torrent_size and brush_config.size:
-            size_limits = [float(size) * 1024 ** 3 for size in brush_config.size.split("-")]
-            add_torrent_size = size_limits[0]  # 使用配置的种子大小下限
+        if not add_torrent_size and brush_config.size_range:
+            add_torrent_size = brush_config.size_range[0]  # 使用配置的种子大小下限
             preset_condition = True
 
         total_size = self.__bytes_to_gb(torrents_size + add_torrent_size)  # 预计总做种体积
@@ -2151,13 +2588,19 @@ class BrushFlow(_PluginBase):
 
         return True, None
 
-    def __evaluate_pre_conditions_for_brush(self, include_network_conditions: bool = True) \
+    def __evaluate_pre_conditions_for_brush(self, include_network_conditions: bool = True,
+                                            downloading_hashes: Optional[Set[str]] = None) \
             -> Tuple[bool, Optional[str]]:
         """
         前置过滤不符合条件的种子
+        :param include_network_conditions: 是否检查带宽条件
+        :param downloading_hashes: 本轮刷流的下载中任务快照，为None时实时查询下载器
         """
+        if downloading_hashes is None:
+            downloading_hashes = self.__get_downloading_hashes()
+
         reasons = [
-            ("maxdlcount", lambda config: self.__get_downloading_count() >= int(config),
+            ("maxdlcount", lambda config: len(downloading_hashes) >= int(config),
              lambda config: f"当前同时下载任务数已达到最大值 {config}，暂时停止新增任务")
         ]
 
@@ -2183,7 +2626,7 @@ class BrushFlow(_PluginBase):
 
         return True, None
 
-    def __evaluate_conditions_for_brush(self, torrent, torrent_tasks) -> Tuple[bool, Optional[str]]:
+    def __evaluate_conditions_for_brush(self, torrent, task_index: BrushTaskIndex) -> Tuple[bool, Optional[str]]:
         """
         过滤不符合条件的种子
         """
@@ -2191,22 +2634,16 @@ class BrushFlow(_PluginBase):
 
         # 排除重复种子
         # 默认根据标题和站点名称进行排除
-        task_key = f"{torrent.site_name}{torrent.title}"
-        if any(task_key == f"{task.get('site_name')}{task.get('title')}" for task in torrent_tasks.values()):
+        if task_index.contains_title(torrent.site_name, torrent.title):
             return False, "重复种子"
 
         # 部分站点标题会上新时携带后缀，这里进一步根据种子详情地址进行排除
-        if torrent.page_url:
-            task_page_url = f"{torrent.site_name}{torrent.page_url}"
-            if any(task_page_url == f"{task.get('site_name')}{task.get('page_url')}" for task in
-                   torrent_tasks.values()):
-                return False, "重复种子"
+        if torrent.page_url and task_index.contains_page_url(torrent.site_name, torrent.page_url):
+            return False, "重复种子"
 
         # 不同站点如果遇到相同种子，判断前一个种子是否已经在做种，否则排除处理
-        if torrent.title:
-            if any(torrent.site_name != f"{task.get('site_name')}" and torrent.title == f"{task.get('title')}"
-                   and not task.get("seed_time") for task in torrent_tasks.values()):
-                return False, "其他站点存在尚未下载完成的相同种子"
+        if torrent.title and task_index.contains_unseeded_title(torrent.site_name, torrent.title):
+            return False, "其他站点存在尚未下载完成的相同种子"
 
         # 促销条件
         if brush_config.freeleech and torrent.downloadvolumefactor != 0:
@@ -2218,39 +2655,38 @@ class BrushFlow(_PluginBase):
         if brush_config.hr == "yes" and torrent.hit_and_run:
             return False, "存在H&R"
 
+        title = torrent.title or ""
+        description = torrent.description or ""
+
         # 包含规则
-        if brush_config.include and not (
-                re.search(brush_config.include, torrent.title, re.I) or re.search(brush_config.include,
-                                                                                  torrent.description, re.I)):
+        if brush_config.include_regex and not (
+                brush_config.include_regex.search(title) or brush_config.include_regex.search(description)):
             return False, "不符合包含规则"
 
         # 排除规则
-        if brush_config.exclude and (
-                re.search(brush_config.exclude, torrent.title, re.I) or re.search(brush_config.exclude,
-                                                                                  torrent.description, re.I)):
+        if brush_config.exclude_regex and (
+                brush_config.exclude_regex.search(title) or brush_config.exclude_regex.search(description)):
             return False, "符合排除规则"
 
         # 种子大小（GB）
-        if brush_config.size:
-            sizes = [float(size) * 1024 ** 3 for size in brush_config.size.split("-")]
-            if len(sizes) == 1 and torrent.size < sizes[0]:
+        if brush_config.size_range:
+            min_size, max_size = brush_config.size_range
+            if max_size is None and torrent.size < min_size:
                 return False, f"种子大小 {self.__bytes_to_gb(torrent.size):.1f} GB，不符合条件"
-            elif len(sizes) > 1 and not sizes[0] <= torrent.size <= sizes[1]:
+            elif max_size is not None and not min_size <= torrent.size <= max_size:
                 return False, f"种子大小 {self.__bytes_to_gb(torrent.size):.1f} GB，不在指定范围内"
 
         # 做种人数
-        if brush_config.seeder:
-            seeders_range = [float(n) for n in brush_config.seeder.split("-")]
+        if brush_config.seeder_range:
+            min_seeders, max_seeders = brush_config.seeder_range
             # 检查是否仅指定了一个数字，即做种人数需要小于等于该数字
-            if len(seeders_range) == 1:
+            if max_seeders is None:
                 # 当做种人数大于该数字时，不符合条件
-                if torrent.seeders > seeders_range[0]:
+                if torrent.seeders > min_seeders:
                     return False, f"做种人数 {torrent.seeders}，超过单个指定值"
-            # 如果指定了一个范围
-            elif len(seeders_range) > 1:
-                # 检查做种人数是否在指定的范围内（包括边界）
-                if not (seeders_range[0] <= torrent.seeders <= seeders_range[1]):
-                    return False, f"做种人数 {torrent.seeders}，不在指定范围内"
+            # 如果指定了一个范围，检查做种人数是否在指定的范围内（包括边界）
+            elif not (min_seeders <= torrent.seeders <= max_seeders):
+                return False, f"做种人数 {torrent.seeders}，不在指定范围内"
 
         # 发布时间：用户时间 - 站点时间 - 时区偏移
         # e.g.1: 用户UTC+8，站点UTC，timezone_offset应为+8，种子在UTC 0:00/UTC+8 8:00发布；
@@ -2258,18 +2694,18 @@ class BrushFlow(_PluginBase):
         # e.g.2: 用户UTC，站点UTC+8，timezone_offset应为-8，种子在UTC 0:00/UTC+8 8:00发布：
         #        1:17 - 8:00 - (-8:00) = 1:17；1小时17分为正确的发布时间与当前的时间差
         # timezone_offset为后加功能，默认为0，方便后续更多与时间相关的功能开发，之前在单独站点配置中使用pubtime计算过时区偏移的用户也不受影响
-        pubdate_minutes = self.__get_pubminutes(torrent.pubdate) - brush_config.timezone_offset
         # 已支持独立站点配置，取消单独适配站点时区逻辑，可通过配置项「pubtime」自行适配
         # pubdate_minutes = self.__adjust_site_pubminutes(pubdate_minutes, torrent)
-        if brush_config.pubtime:
-            pubtimes = [float(n) for n in brush_config.pubtime.split("-")]
-            if len(pubtimes) == 1:
+        if brush_config.pubtime_range:
+            pubdate_minutes = self.__get_pubminutes(torrent.pubdate) - brush_config.timezone_offset
+            min_pubtime, max_pubtime = brush_config.pubtime_range
+            if max_pubtime is None:
                 # 单个值：选择发布时间小于等于该值的种子
-                if pubdate_minutes > pubtimes[0]:
+                if pubdate_minutes > min_pubtime:
                     return False, f"发布时间（站点时区）{torrent.pubdate}，当前配置时区偏移 {brush_config.timezone_offset} 小时，{pubdate_minutes:.0f} 分钟前，不符合条件"
             else:
                 # 范围值：选择发布时间在范围内的种子
-                if not (pubtimes[0] <= pubdate_minutes <= pubtimes[1]):
+                if not (min_pubtime <= pubdate_minutes <= max_pubtime):
                     return False, f"发布时间（站点时区）{torrent.pubdate}，当前配置时区偏移 {brush_config.timezone_offset} 小时，{pubdate_minutes:.0f} 分钟前，不在指定范围内"
 
         return True, None
@@ -2300,8 +2736,8 @@ class BrushFlow(_PluginBase):
 
         with lock:
             logger.info("开始检查刷流下载任务 ...")
-            torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
-            unmanaged_tasks: Dict[str, dict] = self.get_data("unmanaged") or {}
+            torrent_tasks: Dict[str, dict] = self._task_store.load("torrents")
+            unmanaged_tasks: Dict[str, dict] = self._task_store.load("unmanaged")
 
             downloader = self.downloader
             seeding_torrents, error = downloader.get_torrents()
@@ -2386,7 +2822,7 @@ class BrushFlow(_PluginBase):
 
             self.__update_and_save_statistic_info(torrent_tasks)
 
-            self.save_data("torrents", torrent_tasks)
+            self._task_store.save("torrents", torrent_tasks)
 
             logger.info("刷流下载任务检查完成")
 
@@ -2464,8 +2900,8 @@ class BrushFlow(_PluginBase):
                     logger.info(f"站点 {torrent_task.get('site_name')}，"
                                 f"刷流任务种子移除：{torrent_task.get('title')}|{torrent_task.get('description')}")
 
-        self.save_data("torrents", torrent_tasks)
-        self.save_data("unmanaged", unmanaged_tasks)
+        self._task_store.save("torrents", torrent_tasks)
+        self._task_store.save("unmanaged", unmanaged_tasks)
 
         # 发送汇总消息
         if added_tasks:
@@ -2605,9 +3041,13 @@ class BrushFlow(_PluginBase):
         return True, reason
 
     def __delete_torrent_for_evaluate_conditions(self, torrents: List[Any], torrent_tasks: Dict[str, dict],
-                                                 proxy_delete: bool = False) -> List:
+                                                 proxy_delete: bool = False,
+                                                 torrent_info_map: Optional[Dict[str, dict]] = None,
+                                                 dry_run: bool = False) -> List:
         """
         根据条件删除种子并获取已删除列表
+        :param torrent_info_map: 已获取的种子信息，避免重复解析
+        :param dry_run: 是否为动态删种预演，预演时只记录日志，不发送删除通知
         """
         delete_hashes = []
 
@@ -2621,7 +3061,7 @@ class BrushFlow(_PluginBase):
             torrent_title = torrent_task.get("title", "")
             torrent_desc = torrent_task.get("description", "")
 
-            torrent_info = self.__get_torrent_info(torrent)
+            torrent_info = (torrent_info_map or {}).get(torrent_hash) or self.__get_torrent_info(torrent)
 
             # 删除种子的具体实现可能会根据实际情况略有不同
             should_delete, reason = self.__evaluate_conditions_for_delete(site_name=site_name,
@@ -2630,18 +3070,24 @@ class BrushFlow(_PluginBase):
             if should_delete:
                 delete_hashes.append(torrent_hash)
                 reason = "触发动态删除阈值，" + reason if proxy_delete else reason
-                self.__send_delete_message(site_name=site_name, torrent_title=torrent_title, torrent_desc=torrent_desc,
-                                           reason=reason)
-                logger.info(f"站点：{site_name}，{reason}，删除种子：{torrent_title}|{torrent_desc}")
+                if not dry_run:
+                    self.__send_delete_message(site_name=site_name, torrent_title=torrent_title,
+                                               torrent_desc=torrent_desc, reason=reason)
+                logger.info(f"站点：{site_name}，{reason}，{'预演计划删除' if dry_run else '删除'}种子："
+                            f"{torrent_title}|{torrent_desc}")
             else:
                 logger.debug(f"站点：{site_name}，{reason}，不删除种子：{torrent_title}|{torrent_desc}")
 
         return delete_hashes
 
     def __delete_torrent_for_evaluate_proxy_pre_conditions(self, torrents: List[Any],
-                                                           torrent_tasks: Dict[str, dict]) -> List:
+                                                           torrent_tasks: Dict[str, dict],
+                                                           torrent_info_map: Optional[Dict[str, dict]] = None,
+                                                           dry_run: bool = False) -> List:
         """
         根据动态删除前置条件排除H&R种子后删除种子并获取已删除列表
+        :param torrent_info_map: 已获取的种子信息，避免重复解析
+        :param dry_run: 是否为动态删种预演，预演时只记录日志，不发送删除通知
         """
         delete_hashes = []
 
@@ -2660,7 +3106,7 @@ class BrushFlow(_PluginBase):
             torrent_title = torrent_task.get("title", "")
             torrent_desc = torrent_task.get("description", "")
 
-            torrent_info = self.__get_torrent_info(torrent)
+            torrent_info = (torrent_info_map or {}).get(torrent_hash) or self.__get_torrent_info(torrent)
 
             # 删除种子的具体实现可能会根据实际情况略有不同
             should_delete, reason = self.__evaluate_proxy_pre_conditions_for_delete(site_name=site_name,
@@ -2668,9 +3114,11 @@ class BrushFlow(_PluginBase):
                                                                                     torrent_task=torrent_task)
             if should_delete:
                 delete_hashes.append(torrent_hash)
-                self.__send_delete_message(site_name=site_name, torrent_title=torrent_title, torrent_desc=torrent_desc,
-                                           reason=reason)
-                logger.info(f"站点：{site_name}，{reason}，删除种子：{torrent_title}|{torrent_desc}")
+                if not dry_run:
+                    self.__send_delete_message(site_name=site_name, torrent_title=torrent_title,
+                                               torrent_desc=torrent_desc, reason=reason)
+                logger.info(f"站点：{site_name}，{reason}，{'预演计划删除' if dry_run else '删除'}种子："
+                            f"{torrent_title}|{torrent_desc}")
             else:
                 logger.debug(f"站点：{site_name}，{reason}，不删除种子：{torrent_title}|{torrent_desc}")
 
@@ -2682,9 +3130,10 @@ class BrushFlow(_PluginBase):
         - 不管做种体积是否超过设定的动态删除阈值，默认优先执行排除H&R种子后满足「下载超时时间」的种子
         - 上述规则执行完成后，当做种体积依旧超过设定的动态删除阈值时，继续执行下述种子删除规则
         - 优先删除满足用户设置删除规则的全部种子，即便在删除过程中已经低于了阈值下限，也会继续删除
-        - 若删除后还没有达到阈值，则在已完成种子中排除H&R种子后按做种时间倒序进行删除
+        - 若删除后还没有达到阈值，则在已完成种子中排除H&R种子后，选择释放体积满足要求且损失上传速度最少的种子进行删除
         - 动态删除阈值：100，当做种体积 > 100G 时，则开始删除种子，直至降低至 100G
         - 动态删除阈值：50-100，当做种体积 > 100G 时，则开始删除种子，直至降至为 50G
+        - 开启动态删种预演时，只计算删除计划并在插件页面展示，不删除种子也不发送通知
         """
         brush_config = self.__get_brush_config()
 
@@ -2692,25 +3141,33 @@ class BrushFlow(_PluginBase):
         if not (brush_config.proxy_delete and brush_config.delete_size_range):
             return []
 
-        # 获取种子信息Map
+        dry_run = brush_config.proxy_delete_dry_run
+
+        # 获取种子信息Map，后续均基于该快照进行计算
         torrent_info_map = {self.__get_hash(torrent): self.__get_torrent_info(torrent=torrent) for torrent in torrents}
+        # 删除计划，{种子Hash: 删除阶段}
+        delete_plan: Dict[str, str] = {}
 
         # 计算当前总做种体积
         total_torrent_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
+        origin_torrent_size = total_torrent_size
 
         logger.info(
             f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，正在准备计算满足动态前置删除条件的种子")
 
         # 执行排除H&R种子后满足前置删除条件的种子
         pre_delete_hashes = self.__delete_torrent_for_evaluate_proxy_pre_conditions(torrents=torrents,
-                                                                                    torrent_tasks=torrent_tasks) or []
+                                                                                    torrent_tasks=torrent_tasks,
+                                                                                    torrent_info_map=torrent_info_map,
+                                                                                    dry_run=dry_run) or []
 
         # 如果存在前置删除种子，这里进行额外判断，总做种体积排除前置删除种子的体积
         if pre_delete_hashes:
-            pre_delete_total_size = sum(torrent_info_map[self.__get_hash(torrent)].get("total_size", 0)
-                                        for torrent in torrents if self.__get_hash(torrent) in pre_delete_hashes)
+            delete_plan.update(dict.fromkeys(pre_delete_hashes, "前置条件"))
+            pre_delete_total_size = sum(torrent_info_map[torrent_hash].get("total_size") or 0
+                                        for torrent_hash in pre_delete_hashes)
             total_torrent_size = total_torrent_size - pre_delete_total_size
-            torrents = [torrent for torrent in torrents if self.__get_hash(torrent) not in pre_delete_hashes]
+            torrents = [torrent for torrent in torrents if self.__get_hash(torrent) not in delete_plan]
             logger.info(
                 f"满足动态删除前置条件的种子共 {len(pre_delete_hashes)} 个，体积 {self.__bytes_to_gb(pre_delete_total_size):.1f} GB，"
                 f"删除种子后，当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB")
@@ -2730,78 +3187,85 @@ class BrushFlow(_PluginBase):
             logger.info(
                 f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，上限 {self.__bytes_to_gb(max_size):.1f} GB，"
                 f"下限 {self.__bytes_to_gb(min_size):.1f} GB，未进一步触发动态删除")
-            return pre_delete_hashes or []
+            if dry_run:
+                self.__save_delete_plan(delete_plan=delete_plan, torrent_info_map=torrent_info_map,
+                                        torrent_tasks=torrent_tasks, origin_size=origin_torrent_size,
+                                        remaining_size=total_torrent_size)
+                return []
+            return pre_delete_hashes
         else:
             logger.info(
                 f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，上限 {self.__bytes_to_gb(max_size):.1f} GB，"
                 f"下限 {self.__bytes_to_gb(min_size):.1f} GB，进一步触发动态删除")
 
-        need_delete_hashes = []
-        need_delete_hashes.extend(pre_delete_hashes)
-
         # 即使开了动态删除，但是也有可能部分站点单独设置了关闭，这里根据种子托管进行分组，先处理不需要托管的种子，按设置的规则进行删除
         proxy_delete_torrents, not_proxy_delete_torrents = self.__group_torrents_by_proxy_delete(torrents=torrents,
                                                                                                  torrent_tasks=torrent_tasks)
         logger.info(f"托管种子数 {len(proxy_delete_torrents)}，未托管种子数 {len(not_proxy_delete_torrents)}")
         if not_proxy_delete_torrents:
             not_proxy_delete_hashes = self.__delete_torrent_for_evaluate_conditions(torrents=not_proxy_delete_torrents,
-                                                                                    torrent_tasks=torrent_tasks) or []
-            need_delete_hashes.extend(not_proxy_delete_hashes)
-            total_torrent_size -= sum(
-                torrent_info_map[self.__get_hash(torrent)].get("total_size", 0) for torrent in not_proxy_delete_torrents
-                if self.__get_hash(torrent) in not_proxy_delete_hashes)
+                                                                                    torrent_tasks=torrent_tasks,
+                                                                                    torrent_info_map=torrent_info_map,
+                                                                                    dry_run=dry_run) or []
+            delete_plan.update(dict.fromkeys(not_proxy_delete_hashes, "删除规则"))
+            total_torrent_size -= sum(torrent_info_map[torrent_hash].get("total_size") or 0
+                                      for torrent_hash in not_proxy_delete_hashes)
 
         # 如果删除非托管种子后仍未达到最小体积要求，则处理托管种子
         if total_torrent_size > min_size and proxy_delete_torrents:
             proxy_delete_hashes = self.__delete_torrent_for_evaluate_conditions(torrents=proxy_delete_torrents,
                                                                                 torrent_tasks=torrent_tasks,
-                                                                                proxy_delete=True) or []
-            need_delete_hashes.extend(proxy_delete_hashes)
-            total_torrent_size -= sum(
-                torrent_info_map[self.__get_hash(torrent)].get("total_size", 0) for torrent in proxy_delete_torrents if
-                self.__get_hash(torrent) in proxy_delete_hashes)
-
-        # 在完成初始删除步骤后，如果总体积仍然超过最小阈值，则进一步找到已完成种子并排除HR种子后按做种时间正序进行删除
+                                                                                proxy_delete=True,
+                                                                                torrent_info_map=torrent_info_map,
+                                                                                dry_run=dry_run) or []
+            delete_plan.update(dict.fromkeys(proxy_delete_hashes, "删除规则"))
+            total_torrent_size -= sum(torrent_info_map[torrent_hash].get("total_size") or 0
+                                      for torrent_hash in proxy_delete_hashes)
+
+        # 在完成初始删除步骤后，如果总体积仍然超过最小阈值，则在剩余的已完成托管种子中排除HR种子后进一步选择删除
         if total_torrent_size > min_size:
-            # 重新计算当前的种子列表，排除已删除的种子
-            remaining_hashes = list(
-                {self.__get_hash(torrent) for torrent in proxy_delete_torrents} - set(need_delete_hashes))
-            # 这里根据排除后的种子列表，再次从下载器中找到已完成的任务
-            downloader = self.downloader
-            completed_torrents = downloader.get_completed_torrents(ids=remaining_hashes)
-            remaining_hashes = {self.__get_hash(torrent) for torrent in completed_torrents}
-            remaining_torrents = [(_hash, torrent_info_map[_hash]) for _hash in remaining_hashes]
-
-            # 准备一个列表，用于存放满足条件的种子，即非HR种子且有明确做种时间
-            filtered_torrents = [(_hash, info['seeding_time']) for _hash, info in remaining_torrents if
-                                 not torrent_tasks[_hash].get("hit_and_run", False)]
-            sorted_torrents = sorted(filtered_torrents, key=lambda x: x[1], reverse=True)
+            candidates = []
+            for torrent in proxy_delete_torrents:
+                torrent_hash = self.__get_hash(torrent)
+                torrent_info = torrent_info_map.get(torrent_hash)
+                torrent_task = torrent_tasks.get(torrent_hash)
+                if torrent_hash in delete_plan or not torrent_info or not torrent_task:
+                    continue
+                if not torrent_info.get("completed") or torrent_task.get("hit_and_run", False):
+                    continue
+                candidates.append((torrent_hash, torrent_info))
 
             # 进行额外的删除操作，直到满足最小阈值或没有更多种子可删除
-            for torrent_hash, _ in sorted_torrents:
-                if total_torrent_size <= min_size:
-                    break
-                torrent_task = torrent_tasks.get(torrent_hash, None)
-                torrent_info = torrent_info_map.get(torrent_hash, None)
-                if not torrent_task or not torrent_info:
-                    continue
+            for torrent_hash in self.__plan_proxy_delete(candidates=candidates,
+                                                         need_size=total_torrent_size - min_size):
+                torrent_task = torrent_tasks[torrent_hash]
+                torrent_info = torrent_info_map[torrent_hash]
 
-                need_delete_hashes.append(torrent_hash)
-                total_torrent_size -= torrent_info.get("total_size", 0)
+                delete_plan[torrent_hash] = "动态删除"
+                total_torrent_size -= torrent_info.get("total_size") or 0
 
                 site_name = torrent_task.get("site_name", "")
                 torrent_title = torrent_task.get("title", "")
                 torrent_desc = torrent_task.get("description", "")
-                seeding_time = torrent_task.get("seeding_time", 0)
-                if seeding_time:
-                    reason = (f"触发动态删除阈值，系统自动删除，做种时间 {seeding_time / 3600:.1f} 小时，"
-                              f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB")
-                    # 如果是区间删除，一次性删除的数据过多，取消消息推送
-                    if not proxy_size_range:
-                        self.__send_delete_message(site_name=site_name, torrent_title=torrent_title,
-                                                   torrent_desc=torrent_desc,
-                                                   reason=reason)
-                    logger.info(f"站点：{site_name}，{reason}，删除种子：{torrent_title}|{torrent_desc}")
+                seeding_time = torrent_info.get("seeding_time") or 0
+                reason = (f"触发动态删除阈值，系统自动删除，做种时间 {seeding_time / 3600:.1f} 小时，"
+                          f"平均上传速度 {StringUtils.str_filesize(torrent_info.get('avg_upspeed') or 0)}/s，"
+                          f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB")
+                # 如果是区间删除，一次性删除的数据过多，取消消息推送
+                if not proxy_size_range and not dry_run:
+                    self.__send_delete_message(site_name=site_name, torrent_title=torrent_title,
+                                               torrent_desc=torrent_desc,
+                                               reason=reason)
+                logger.info(f"站点：{site_name}，{reason}，{'预演计划删除' if dry_run else '删除'}种子："
+                            f"{torrent_title}|{torrent_desc}")
+
+        need_delete_hashes = list(delete_plan)
+
+        if dry_run:
+            self.__save_delete_plan(delete_plan=delete_plan, torrent_info_map=torrent_info_map,
+                                    torrent_tasks=torrent_tasks, origin_size=origin_torrent_size,
+                                    remaining_size=total_torrent_size)
+            return []
 
         delete_sites = {torrent_tasks[hash_key].get('site_name', '') for hash_key in need_delete_hashes if
                         hash_key in torrent_tasks}
@@ -2816,6 +3280,126 @@ class BrushFlow(_PluginBase):
         # 返回所有需要删除的种子的哈希列表
         return need_delete_hashes
 
+    @staticmethod
+    def __plan_proxy_delete(candidates: List[Tuple[str, dict]], need_size: float, resolution: int = 500) -> List[str]:
+        """
+        从候选种子中选择需要删除的种子，在释放体积不低于need_size的前提下尽量减少损失的平均上传速度
+        将体积按need_size/resolution向下取整后按0-1背包求解，并与按单位体积上传速度贪心选择的结果比较取优
+        H&R种子及未完成的种子由调用方排除，不参与选择，限制如下：
+        - 背包只以平均上传速度为代价，做种时间仅用于贪心选择时单位体积上传速度相同的排序
+        - 小于need_size/resolution的种子在背包中体积记为0，不会被背包选中，只能由贪心选择
+        - 背包结果未通过校验（释放体积不足或损失的上传速度高于贪心选择）时使用贪心选择的结果
+        :param candidates: [(种子Hash, 种子信息)]
+        :param need_size: 至少需要释放的体积
+        :param resolution: 体积划分的精度
+        :return: 按单位体积上传速度由低到高排列的种子Hash
+        """
+        if need_size <= 0 or not candidates:
+            return []
+
+        def __size(info: dict) -> float:
+            return info.get("total_size") or 0
+
+        def __upspeed(info: dict) -> float:
+            return info.get("avg_upspeed") or 0
+
+        # 单位体积上传速度由低到高，相同时做种时间长的优先
+        ordered = sorted(candidates, key=lambda x: (__upspeed(x[1]) / max(__size(x[1]), 1),
+                                                    -(x[1].get("seeding_time") or 0)))
+
+        # 全部删除也无法满足要求时，删除全部候选种子
+        if sum(__size(info) for _, info in ordered) < need_size:
+            return [torrent_hash for torrent_hash, _ in ordered]
+
+        # 贪心选择
+        greedy = []
+        freed_size = 0
+        for index, (_, torrent_info) in enumerate(ordered):
+            if freed_size >= need_size:
+                break
+            greedy.append(index)
+            freed_size += __size(torrent_info)
+
+        # 0-1背包，dp[状态] 为释放体积达到该状态时损失的最小上传速度，体积向下取整保证结果满足要求
+        # 每个种子只记录更新了哪些状态的位图，未封顶的状态由体积反推上一状态，封顶状态单独记录上一状态
+        unit = need_size / resolution
+        dp = [0.0] + [float("inf")] * resolution
+        choices: List[Tuple[int, int, int]] = []
+        for _, torrent_info in ordered:
+            weight = int(__size(torrent_info) // unit)
+            cost = __upspeed(torrent_info)
+            updated, capped_parent = 0, -1
+            if weight > 0:
+                current = dp[:]
+                for state, value in enumerate(dp):
+                    if value == float("inf"):
+                        continue
+                    target = min(resolution, state + weight)
+                    if value + cost < current[target]:
+                        current[target] = value + cost
+                        updated |= 1 << target
+                        if target == resolution:
+                            capped_parent = state
+                dp = current
+            choices.append((weight, updated, capped_parent))
+
+        selected = greedy
+        greedy_cost = sum(__upspeed(ordered[index][1]) for index in greedy)
+        if dp[resolution] < greedy_cost:
+            knapsack = []
+            state = resolution
+            for index in range(len(ordered) - 1, -1, -1):
+                weight, updated, capped_parent = choices[index]
+                if updated >> state & 1:
+                    knapsack.append(index)
+                    state = capped_parent if state == resolution else state - weight
+            # 校验回溯结果，释放体积须满足要求且损失的上传速度不高于贪心选择
+            if (state == 0
+                    and sum(__size(ordered[index][1]) for index in knapsack) >= need_size
+                    and sum(__upspeed(ordered[index][1]) for index in knapsack) <= greedy_cost):
+                selected = knapsack
+            else:
+                logger.warning("动态删除种子计划校验未通过，使用贪心选择的结果")
+
+        # 上传速度高的种子如果不删除也能满足要求则保留
+        selected = set(selected)
+        freed_size = sum(__size(ordered[index][1]) for index in selected)
+        for index in sorted(selected, key=lambda x: __upspeed(ordered[x][1]), reverse=True):
+            if freed_size - __size(ordered[index][1]) >= need_size:
+                selected.discard(index)
+                freed_size -= __size(ordered[index][1])
+
+        return [torrent_hash for index, (torrent_hash, _) in enumerate(ordered) if index in selected]
+
+    def __save_delete_plan(self, delete_plan: Dict[str, str], torrent_info_map: Dict[str, dict],
+                           torrent_tasks: Dict[str, dict], origin_size: float, remaining_size: float):
+        """
+        保存动态删种预演的删除计划，用于插件页面展示
+        """
+        items = []
+        for torrent_hash, stage in delete_plan.items():
+            torrent_info = torrent_info_map.get(torrent_hash) or {}
+            torrent_task = torrent_tasks.get(torrent_hash) or {}
+            items.append({
+                "hash": torrent_hash,
+                "site_name": torrent_task.get("site_name"),
+                "title": torrent_task.get("title") or torrent_info.get("title"),
+                "size": torrent_info.get("total_size") or 0,
+                "avg_upspeed": torrent_info.get("avg_upspeed") or 0,
+                "seeding_time": torrent_info.get("seeding_time") or 0,
+                "stage": stage
+            })
+        freed_size = sum(item.get("size") for item in items)
+        logger.info(f"动态删种预演：计划删除 {len(items)} 个种子，预计释放 {self.__bytes_to_gb(freed_size):.1f} GB，"
+                    f"删除后做种体积 {self.__bytes_to_gb(remaining_size):.1f} GB，未实际删除种子")
+        self.save_data("delete_plan", {
+            "time": time.time(),
+            "origin_size": origin_size,
+            "remaining_size": remaining_size,
+            "freed_size": freed_size,
+            "items": items
+        })
+
     def __update_undeleted_torrents_missing_in_downloader(self, torrent_tasks, torrent_check_hashes, torrents):
         """
         处理已经被删除，但是任务记录中还没有被标记删除的种子
@@ -2884,32 +3468,42 @@ class BrushFlow(_PluginBase):
 
     def __update_and_save_statistic_info(self, torrent_tasks):
         """
-        更新并保存统计信息
+        更新并保存统计信息，已归档任务使用归档时累计的统计数据，只需要遍历当前任务
+        只有已归档任务的统计是增量更新的，当前任务的上传量、下载量等在每次检查时都会变化，仍需每次遍历全部当前任务重新汇总
         """
-        total_count, total_uploaded, total_downloaded, total_deleted = 0, 0, 0, 0
-        active_uploaded, active_downloaded, active_count, total_unarchived = 0, 0, 0, 0
-
         statistic_info = self.__get_statistic_info()
-        archived_tasks = self.get_data("archived") or {}
-        combined_tasks = {**torrent_tasks, **archived_tasks}
-
-        for task in combined_tasks.values():
-            if task.get("deleted", False):
-                total_deleted += 1
-            total_downloaded += task.get("downloaded", 0)
-            total_uploaded += task.get("uploaded", 0)
+        archived_statistic = self.__get_archived_statistic(statistic_info=statistic_info)
 
-        # 计算torrent_tasks中未标记为删除的活跃任务的统计信息，及待归档的任务数
+        # 当前任务的统计，活跃任务为未标记为删除的任务，已删除的为待归档任务
+        current_statistic = self.__new_task_statistic()
+        active_uploaded, active_downloaded, active_count = 0, 0, 0
+        site_active_counts: Dict[str, int] = {}
         for task in torrent_tasks.values():
+            self.__accumulate_task_statistic(statistic=current_statistic, task=task)
             if not task.get("deleted", False):
                 active_uploaded += task.get("uploaded", 0)
                 active_downloaded += task.get("downloaded", 0)
                 active_count += 1
-            else:
-                total_unarchived += 1
+                site_name = task.get("site_name") or ""
+                site_active_counts[site_name] = site_active_counts.get(site_name, 0) + 1
+        total_unarchived = current_statistic["deleted"]
+
+        # 合并已归档任务及当前任务的站点统计
+        site_statistics: Dict[str, dict] = {}
+        for statistic in [archived_statistic, current_statistic]:
+            for site_name, site_statistic in statistic["sites"].items():
+                merged = site_statistics.setdefault(site_name, {"count": 0, "deleted": 0, "uploaded": 0,
+                                                                "downloaded": 0, "active": 0})
+                for key, value in site_statistic.items():
+                    merged[key] += value
+        for site_name, count in site_active_counts.items():
+            site_statistics[site_name]["active"] = count
 
         # 更新统计信息
-        total_count = len(combined_tasks)
+        total_count = archived_statistic["count"] + current_statistic["count"]
+        total_deleted = archived_statistic["deleted"] + current_statistic["deleted"]
+        total_uploaded = archived_statistic["uploaded"] + current_statistic["uploaded"]
+        total_downloaded = archived_statistic["downloaded"] + current_statistic["downloaded"]
         statistic_info.update({
             "uploaded": total_uploaded,
             "downloaded": total_downloaded,
@@ -2918,7 +3512,8 @@ class BrushFlow(_PluginBase):
             "count": total_count,
             "active": active_count,
             "active_uploaded": active_uploaded,
-            "active_downloaded": active_downloaded
+            "active_downloaded": active_downloaded,
+            "sites": site_statistics
         })
 
         logger.info(f"刷流任务统计数据，总任务数：{total_count}，活跃任务数：{active_count}，已删除：{total_deleted}，"
@@ -2929,7 +3524,62 @@ class BrushFlow(_PluginBase):
                     f"总下载量：{StringUtils.str_filesize(total_downloaded)}")
 
         self.save_data("statistic", statistic_info)
-        self.save_data("torrents", torrent_tasks)
+        self.__record_statistic_history(statistic_info=statistic_info)
+        self._task_store.save("torrents", torrent_tasks)
+
+    @staticmethod
+    def __new_task_statistic() -> dict:
+        """
+        初始化任务统计数据
+        """
+        return {"count": 0, "deleted": 0, "uploaded": 0, "downloaded": 0, "sites": {}}
+
+    @staticmethod
+    def __accumulate_task_statistic(statistic: dict, task: dict, sign: int = 1):
+        """
+        将任务累加到统计数据及对应站点的统计数据中，sign为-1时扣除
+        """
+        site_name = task.get("site_name") or ""
+        site_statistic = statistic["sites"].setdefault(site_name, {"count": 0, "deleted": 0,
+                                                                   "uploaded": 0, "downloaded": 0})
+        for target in [statistic, site_statistic]:
+            target["count"] += sign
+            target["deleted"] += sign if task.get("deleted", False) else 0
+            target["uploaded"] += sign * (task.get("uploaded") or 0)
+            target["downloaded"] += sign * (task.get("downloaded") or 0)
+        if site_statistic["count"] <= 0:
+            statistic["sites"].pop(site_name, None)
+
+    def __get_archived_statistic(self, statistic_info: dict) -> dict:
+        """
+        获取已归档任务的累计统计数据，旧版本没有累计数据时根据已归档任务初始化一次
+        """
+        archived_statistic = statistic_info.get("archived")
+        if archived_statistic is None:
+            archived_statistic = self.__new_task_statistic()
+            for task in self._task_store.load("archived", track=False).values():
+                self.__accumulate_task_statistic(statistic=archived_statistic, task=task)
+            statistic_info["archived"] = archived_statistic
+        return archived_statistic
+
+    def __record_statistic_history(self, statistic_info: dict):
+        """
+        按小时记录累计上传量、下载量及各站点累计上传量，同一小时内只保留最新的数据
+        """
+        history = self.get_data("statistic_history") or []
+        bucket = int(time.time() // 3600 * 3600)
+        record = {
+            "time": bucket,
+            "uploaded": statistic_info.get("uploaded") or 0,
+            "downloaded": statistic_info.get("downloaded") or 0,
+            "sites": {site_name: site_statistic.get("uploaded") or 0
+                      for site_name, site_statistic in (statistic_info.get("sites") or {}).items()}
+        }
+        if history and history[-1].get("time") == bucket:
+            history[-1] = record
+        else:
+            history.append(record)
+        self.save_data("statistic_history", history[-self._statistic_history_hours:])
 
     def __get_brush_config(self, sitename: str = None) -> BrushConfig:
         """
@@ -3042,6 +3692,7 @@ class BrushFlow(_PluginBase):
             "except_subscribe": brush_config.except_subscribe,
             "brush_sequential": brush_config.brush_sequential,
             "proxy_delete": brush_config.proxy_delete,
+            "proxy_delete_dry_run": brush_config.proxy_delete_dry_run,
             "active_time_range": brush_config.active_time_range,
             "cron": brush_config.cron,
             "qb_category": brush_config.qb_category,
@@ -3282,11 +3933,11 @@ class BrushFlow(_PluginBase):
         """
         try:
             all_hashes = []
+            # 下载器类型只需判断一次
+            is_qbittorrent = DownloaderHelper().is_downloader("qbittorrent", service=self.service_info)
             for torrent in torrents:
                 # 根据下载器类型获取Hash值
-                hash_value = torrent.get("hash") if DownloaderHelper().is_downloader("qbittorrent",
-                                                                                     service=self.service_info) \
-                    else torrent.hashString
+                hash_value = torrent.get("hash") if is_qbittorrent else torrent.hashString
                 if hash_value:
                     all_hashes.append(hash_value)
             return all_hashes
@@ -3401,6 +4052,8 @@ class BrushFlow(_PluginBase):
             downloaded = torrent.get("downloaded")
             # 种子大小
             total_size = torrent.get("total_size")
+            # 是否已完成
+            completed = (torrent.get("progress") or 0) >= 1
             # 添加时间
             add_on = (torrent.get("added_on") or 0)
             add_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(add_on))
@@ -3445,6 +4098,8 @@ class BrushFlow(_PluginBase):
                 iatime = date_now - int(torrent.date_active.timestamp())
             # 种子大小
             total_size = torrent.total_size
+            # 是否已完成
+            completed = (torrent.progress or 0) >= 100
             # 添加时间
             add_on = (torrent.date_added.timestamp() if torrent.date_added else 0)
             add_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(add_on))
@@ -3464,6 +4119,7 @@ class BrushFlow(_PluginBase):
             "iatime": iatime,
             "dltime": dltime,
             "total_size": total_size,
+            "completed": completed,
             "add_time": add_time,
             "add_on": add_on,
             "tags": tags,
@@ -3571,46 +4227,75 @@ class BrushFlow(_PluginBase):
         获取任务中的种子总大小
         """
         # 读取种子记录
-        task_info = self.get_data("torrents") or {}
+        task_info = self._task_store.load("torrents", track=False)
         if not task_info:
             return 0
         total_size = sum([task.get("size") or 0 for task in task_info.values()])
         return total_size
 
-    def __get_average_bandwidth(self, sample_count: int = 5, interval: float = 3.0) \
-            -> Tuple[Optional[float], Optional[float]]:
+    def __get_average_bandwidth(self, sample_count: int = 4) -> Tuple[Optional[float], Optional[float]]:
         """
-        多次采样上传和下载带宽，取平均值
+        取后台最近几次带宽采样的平均值，没有有效采样时实时采样一次
         """
-        upload_speeds = []
-        download_speeds = []
-        start_time = time.time()
-        for _ in range(sample_count):
+        expire_time = time.time() - sample_count * self._bandwidth_interval * 2
+        samples = [sample for sample in list(self._bandwidth_samples)[-sample_count:] if sample[0] >= expire_time]
+        if not samples:
             downloader_info = self.__get_downloader_info()
-            if downloader_info:
-                upload_speeds.append(downloader_info.upload_speed or 0)
-                download_speeds.append(downloader_info.download_speed or 0)
-            # 采样间隔
-            time.sleep(interval)
-        end_time = time.time()
-        total_duration = end_time - start_time
-        if not upload_speeds or not download_speeds:
-            return None, None
-        avg_upload_speed = sum(upload_speeds) / len(upload_speeds) if upload_speeds else 0
-        avg_download_speed = sum(download_speeds) / len(download_speeds) if download_speeds else 0
+            if not downloader_info:
+                return None, None
+            samples = [(time.time(), downloader_info.upload_speed or 0, downloader_info.download_speed or 0)]
+            self._bandwidth_samples.append(samples[0])
+        avg_upload_speed = sum(sample[1] for sample in samples) / len(samples)
+        avg_download_speed = sum(sample[2] for sample in samples) / len(samples)
         logger.debug(f"平均上传带宽 {StringUtils.str_filesize(avg_upload_speed)}, "
                      f"平均下载带宽 {StringUtils.str_filesize(avg_download_speed)}, "
-                     f"采样次数={sample_count}, 时长={total_duration:.2f} 秒")
+                     f"采样次数={len(samples)}, 时长={time.time() - samples[0][0]:.2f} 秒")
         return avg_upload_speed, avg_download_speed
 
-    def __get_downloader_info(self) -> schemas.DownloaderInfo:
+    def __start_bandwidth_sampler(self):
+        """
+        启动后台带宽采样线程
+        """
+        self.__stop_bandwidth_sampler()
+        self._bandwidth_samples.clear()
+        self._bandwidth_event.clear()
+        self._bandwidth_sampler = threading.Thread(target=self.__sample_bandwidth,
+                                                   name="BrushFlowBandwidthSampler",
+                                                   daemon=True)
+        self._bandwidth_sampler.start()
+
+    def __stop_bandwidth_sampler(self):
+        """
+        停止后台带宽采样线程
+        """
+        if not self._bandwidth_sampler:
+            return
+        self._bandwidth_event.set()
+        self._bandwidth_sampler.join(timeout=self._bandwidth_interval + 5)
+        self._bandwidth_sampler = None
+
+    def __sample_bandwidth(self):
+        """
+        按固定间隔采样下载器上传和下载带宽
+        """
+        while not self._bandwidth_event.is_set():
+            try:
+                downloader_info = self.__get_downloader_info(check_downloader=False)
+                self._bandwidth_samples.append((time.time(),
+                                                downloader_info.upload_speed or 0,
+                                                downloader_info.download_speed or 0))
+            except Exception as e:
+                logger.debug(f"带宽采样失败：{e}")
+            self._bandwidth_event.wait(self._bandwidth_interval)
+
+    def __get_downloader_info(self, check_downloader: bool = True) -> schemas.DownloaderInfo:
         """
         获取下载器实时信息（所有下载器）
+        :param check_downloader: 是否检查刷流下载器连接状态，后台采样时不检查，避免下载器断开时重复通知
         """
         ret_info = schemas.DownloaderInfo()
 
-        downloader = self.downloader
-        if not downloader:
+        if check_downloader and not self.downloader:
             return ret_info
 
         transfer_infos = self.chain.run_module("downloader_info")
@@ -3623,25 +4308,25 @@ class BrushFlow(_PluginBase):
 
         return ret_info
 
-    def __get_downloading_count(self) -> int:
+    def __get_downloading_hashes(self) -> Set[str]:
         """
-        获取正在下载的任务数量
+        获取正在下载的刷流任务Hash
         """
         try:
             brush_config = self.__get_brush_config()
             downloader = self.downloader
             if not downloader:
-                return 0
+                return set()
 
             torrents = downloader.get_downloading_torrents(tags=brush_config.brush_tag)
             if torrents is None:
                 logger.warning("获取下载数量失败，可能是下载器连接发生异常")
-                return 0
+                return set()
 
-            return len(torrents)
+            return set(self.__get_all_hashes(torrents))
         except Exception as e:
             logger.error(f"获取下载数量发生异常: {e}")
-            return 0
+            return set()
 
     @staticmethod
     def __get_pubminutes(pubdate: str) -> float:
@@ -3651,14 +4336,36 @@ class BrushFlow(_PluginBase):
         try:
             if not pubdate:
                 return 0
-            pubdate = pubdate.replace("T", " ").replace("Z", "")
-            pubdate = datetime.strptime(pubdate, "%Y-%m-%d %H:%M:%S")
-            now = datetime.now()
-            return (now - pubdate).total_seconds() // 60
+            return (datetime.now() - BrushFlow.__parse_pubdate(pubdate)).total_seconds() // 60
         except Exception as e:
             logger.error(f"发布时间 {pubdate} 获取分钟失败，错误详情: {e}")
             return 0
 
+    @staticmethod
+    def __get_sort_pubminutes(pubdate: str) -> float:
+        """
+        获取用于排序的发布时间与当前时间差（分钟），没有发布时间或解析失败时排在最后
+        """
+        if not pubdate:
+            return float("inf")
+        try:
+            return (datetime.now() - BrushFlow.__parse_pubdate(pubdate)).total_seconds() // 60
+        except Exception as e:
+            logger.debug(f"发布时间 {pubdate} 解析失败，排序时排在最后，错误详情: {e}")
+            return float("inf")
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def __parse_pubdate(pubdate: str) -> datetime:
+        """
+        解析发布时间，同一发布时间只解析一次
+        """
+        pubdate = pubdate.replace("T", " ").replace("Z", "")
+        try:
+            return datetime.fromisoformat(pubdate)
+        except ValueError:
+            return datetime.strptime(pubdate, "%Y-%m-%d %H:%M:%S")
+
     @staticmethod
     def __adjust_site_pubminutes(pub_minutes: float, torrent: TorrentInfo) -> float:
         """
@@ -3761,8 +4468,18 @@ class BrushFlow(_PluginBase):
         unique_titles = {title for titles in self._subscribe_infos.values() for title in titles}
         return unique_titles
 
+    def __get_subscribe_matcher(self) -> SubscribeTitleMatcher:
+        """
+        获取订阅标题匹配器，订阅标题没有变化时复用已构建的匹配器
+        """
+        subscribe_titles = self.__get_subscribe_titles()
+        if self._subscribe_matcher is None or self._subscribe_matcher.titles != subscribe_titles:
+            self._subscribe_matcher = SubscribeTitleMatcher(subscribe_titles)
+            logger.debug(f"订阅标题匹配器已重建，标题数量：{len(self._subscribe_matcher.titles)}")
+        return self._subscribe_matcher
+
     @staticmethod
-    def __filter_torrents_contains_subscribe(torrents: Any, subscribe_titles: Set[str]):
+    def __filter_torrents_contains_subscribe(torrents: Any, subscribe_matcher: SubscribeTitleMatcher):
         # 初始化两个列表，一个用于收集未被排除的种子，一个用于记录被排除的种子
         included_torrents = []
         excluded_torrents = []
@@ -3773,10 +4490,13 @@ class BrushFlow(_PluginBase):
             title = torrent.title or ''
             description = torrent.description or ''
 
-            if any(subscribe_title in title or subscribe_title in description for subscribe_title in subscribe_titles):
+            subscribe_title = subscribe_matcher.search(title)
+            if subscribe_title is None:
+                subscribe_title = subscribe_matcher.search(description)
+            if subscribe_title is not None:
                 # 如果种子的标题或描述包含订阅标题中的任一项，则记录为被排除
                 excluded_torrents.append(torrent)
-                logger.info(f"命中订阅内容，排除种子：{title}|{description}")
+                logger.info(f"命中订阅内容 {subscribe_title}，排除种子：{title}|{description}")
             else:
                 # 否则，收集为未被排除的种子
                 included_torrents.append(torrent)
@@ -3832,8 +4552,8 @@ class BrushFlow(_PluginBase):
             logger.info("自动归档记录天数小于等于0，取消自动归档")
             return
 
-        # 用于存储已删除的数据
-        archived_tasks: Dict[str, dict] = self.get_data("archived") or {}
+        # 本次需要归档的数据，追加保存，不需要加载已归档的全部数据
+        archived_tasks: Dict[str, dict] = {}
 
         current_time = time.time()
         archive_threshold_seconds = self._brush_config.auto_archive_days * 86400  # 将天数转换为秒数
@@ -3861,17 +4581,41 @@ class BrushFlow(_PluginBase):
         for key in keys_to_delete:
             del torrent_tasks[key]
 
-        self.save_data("archived", archived_tasks)
+        if not archived_tasks:
+            return
+
+        # 归档时累计已归档任务的统计数据，重复归档的任务先扣除原有数据
+        statistic_info = self.__get_statistic_info()
+        archived_statistic = self.__get_archived_statistic(statistic_info=statistic_info)
+        for task in self._task_store.get("archived", archived_tasks.keys()).values():
+            self.__accumulate_task_statistic(statistic=archived_statistic, task=task, sign=-1)
+        for task in archived_tasks.values():
+            self.__accumulate_task_statistic(statistic=archived_statistic, task=task)
+
+        self._task_store.append("archived", archived_tasks)
+        self.save_data("statistic", statistic_info)
 
     def __clear_tasks(self):
         """
         清除统计数据
         彻底重置所有刷流数据，如当前还存在正在做种的刷流任务，待定时检查任务执行后，会自动纳入刷流管理
         """
-        self.save_data("torrents", {})
-        self.save_data("archived", {})
-        self.save_data("unmanaged", {})
+        self._task_store.clear()
         self.save_data("statistic", {})
+        self.save_data("statistic_history", [])
+
+    def __migrate_task_data(self):
+        """
+        将旧版本整体保存在插件数据中的任务迁移到任务存储，每个任务一行
+        """
+        for kind in ["torrents", "archived", "unmanaged"]:
+            legacy_tasks = self.get_data(kind)
+            if not isinstance(legacy_tasks, dict):
+                continue
+            if legacy_tasks and not self._task_store.count(kind):
+                self._task_store.append(kind, legacy_tasks)
+                logger.info(f"已迁移刷流任务数据 {kind}，共 {len(legacy_tasks)} 条")
+            self.del_data(key=kind)
 
     def __get_statistic_info(self) -> Dict[str, int]:
         """
@@ -0,0 +1,168 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class BrushTaskStore(object):
+    """
+    刷流任务存储，每个任务一行保存在插件数据目录的SQLite数据库中，按分类（torrents/archived/unmanaged）区分
+    加载时记录各任务的序列化内容，保存时只写入有变化的任务，任务添加时间单独保存一列并建立索引
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        :param db_path: 数据库文件路径
+        """
+        self._db_path = db_path
+        self._lock = Lock()
+        # {分类: {种子Hash: 最近一次加载或保存的序列化内容}}
+        self._snapshots: Dict[str, Dict[str, str]] = {}
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.__connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS brush_task ("
+                         "kind TEXT NOT NULL, "
+                         "hash TEXT NOT NULL, "
+                         "data TEXT NOT NULL, "
+                         "time REAL, "
+                         "PRIMARY KEY (kind, hash))")
+            # 旧版本数据库没有添加时间列，补充后从任务内容回填
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(brush_task)").fetchall()}
+            if "time" not in columns:
+                conn.execute("ALTER TABLE brush_task ADD COLUMN time REAL")
+                conn.execute("UPDATE brush_task SET time = json_extract(data, '$.time')")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_brush_task_time ON brush_task (kind, time)")
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        打开数据库连接，正常退出时提交事务
+        """
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def __time(task: dict) -> Optional[float]:
+        """
+        任务添加时间，格式不正确时返回None
+        """
+        try:
+            return float(task.get("time"))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def __dumps(task: dict) -> str:
+        """
+        序列化任务，键排序保证内容不变时结果一致
+        """
+        return json.dumps(task, ensure_ascii=False, sort_keys=True)
+
+    def __read(self, kind: str) -> Dict[str, str]:
+        """
+        读取分类下全部任务的序列化内容
+        """
+        with self.__connect() as conn:
+            rows = conn.execute("SELECT hash, data FROM brush_task WHERE kind = ?", (kind,)).fetchall()
+        return dict(rows)
+
+    def count(self, kind: str) -> int:
+        """
+        分类下的任务数
+        """
+        with self.__connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM brush_task WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def get(self, kind: str, hashes: Iterable[str]) -> Dict[str, dict]:
+        """
+        按种子Hash获取分类下的部分任务，不存在的任务不返回
+        """
+        hashes = list(hashes)
+        tasks = {}
+        with self.__connect() as conn:
+            # 分批查询，避免超出SQLite参数数量限制
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i:i + 500]
+                rows = conn.execute(f"SELECT hash, data FROM brush_task WHERE kind = ? "
+                                    f"AND hash IN ({','.join('?' * len(batch))})", (kind, *batch)).fetchall()
+                tasks.update({torrent_hash: json.loads(data) for torrent_hash, data in rows})
+        return tasks
+
+    def recent(self, kind: str, limit: int) -> List[dict]:
+        """
+        获取分类下最近添加的任务，按添加时间倒序
+        """
+        with self.__connect() as conn:
+            rows = conn.execute("SELECT data FROM brush_task WHERE kind = ? "
+                                "ORDER BY time DESC LIMIT ?", (kind, limit)).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def load(self, kind: str, track: bool = True) -> Dict[str, dict]:
+        """
+        加载分类下的全部任务
+        :param kind: 任务分类
+        :param track: 是否记录加载时的内容，用于后续保存时比较变化，只读场景传False
+        """
+        with self._lock:
+            snapshot = self.__read(kind)
+            if track:
+                self._snapshots[kind] = snapshot
+        return {torrent_hash: json.loads(data) for torrent_hash, data in snapshot.items()}
+
+    def save(self, kind: str, tasks: Dict[str, dict]) -> int:
+        """
+        保存分类下的全部任务，只写入新增或变化的任务，并删除已不存在的任务
+        :return: 写入及删除的任务数
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(kind)
+            if snapshot is None:
+                snapshot = self.__read(kind)
+            current = {torrent_hash: self.__dumps(task) for torrent_hash, task in tasks.items()}
+            changed = [(kind, torrent_hash, data, self.__time(tasks[torrent_hash]))
+                       for torrent_hash, data in current.items() if snapshot.get(torrent_hash) != data]
+            removed = [(kind, torrent_hash) for torrent_hash in snapshot if torrent_hash not in current]
+            if changed or removed:
+                with self.__connect() as conn:
+                    conn.executemany("INSERT OR REPLACE INTO brush_task (kind, hash, data, time) VALUES (?, ?, ?, ?)",
+                                     changed)
+                    conn.executemany("DELETE FROM brush_task WHERE kind = ? AND hash = ?", removed)
+            self._snapshots[kind] = current
+        return len(changed) + len(removed)
+
+    def append(self, kind: str, tasks: Dict[str, dict]) -> int:
+        """
+        追加或覆盖分类下的部分任务，不需要加载分类下的全部任务
+        :return: 写入的任务数
+        """
+        if not tasks:
+            return 0
+        rows = [(kind, torrent_hash, self.__dumps(task), self.__time(task)) for torrent_hash, task in tasks.items()]
+        with self._lock:
+            with self.__connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO brush_task (kind, hash, data, time) VALUES (?, ?, ?, ?)", rows)
+            snapshot = self._snapshots.get(kind)
+            if snapshot is not None:
+                snapshot.update({torrent_hash: data for _, torrent_hash, data, _ in rows})
+        return len(rows)
+
+    def clear(self, kind: Optional[str] = None):
+        """
+        清空指定分类或全部任务
+        """
+        with self._lock:
+            with self.__connect() as conn:
+                if kind:
+                    conn.execute("DELETE FROM brush_task WHERE kind = ?", (kind,))
+                else:
+                    conn.execute("DELETE FROM brush_task")
+            if kind:
+                self._snapshots.pop(kind, None)
+            else:
+                self._snapshots = {}
@@ -2,10 +2,12 @@ import hashlib
 import os
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
+from queue import Empty, Full, Queue
 from threading import Event
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import pytz
 import requests
@@ -62,23 +64,67 @@ class CSSiteConfig(object):
 
 
 class TorInfo:
+    """
+    种子信息，Hash以20字节二进制保存，对外仍按十六进制字符串读写
+    """
+    __slots__ = ("_site_name", "torrent_path", "file_path", "_info_hash", "_pieces_hash",
+                 "torrent_id", "torrent_announce", "_name_id_tag")
 
     def __init__(
             self,
             site_name: str = None,
             torrent_path: str = None,
             file_path: str = None,
-            info_hash: str = None,
-            pieces_hash: str = None,
+            info_hash: Union[str, bytes] = None,
+            pieces_hash: Union[str, bytes] = None,
             torrent_id: str = None,
     ) -> None:
-        self.site_name = site_name
+        self._site_name = site_name
         self.torrent_path = torrent_path
         self.file_path = file_path
-        self.info_hash = info_hash
-        self.pieces_hash = pieces_hash
+        self._info_hash = self.__to_digest(info_hash)
+        self._pieces_hash = self.__to_digest(pieces_hash)
         self.torrent_id = torrent_id
         self.torrent_announce = None
+        self._name_id_tag = None
+
+    @staticmethod
+    def __to_digest(value: Union[str, bytes, None]) -> Optional[bytes]:
+        """
+        十六进制Hash转为二进制，格式不正确时返回None
+        """
+        if not value:
+            return None
+        if isinstance(value, bytes):
+            return value
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            return None
+
+    @property
+    def site_name(self) -> Optional[str]:
+        return self._site_name
+
+    @site_name.setter
+    def site_name(self, value: str):
+        self._site_name = value
+        self._name_id_tag = None
+
+    @property
+    def info_hash(self) -> Optional[str]:
+        return self._info_hash.hex() if self._info_hash else None
+
+    @property
+    def pieces_hash(self) -> Optional[str]:
+        return self._pieces_hash.hex() if self._pieces_hash else None
+
+    @property
+    def pieces_digest(self) -> Optional[bytes]:
+        """
+        二进制pieces_hash，用作字典和集合的键，避免重复转换十六进制
+        """
+        return self._pieces_hash
 
     @staticmethod
     def local(torrent_path: str, info_hash: str, pieces_hash: str):
@@ -99,8 +145,8 @@ class TorInfo:
             torrent = bdecode(data)
             info = torrent["info"]
             pieces = info["pieces"]
-            info_hash = hashlib.sha1(bencode(info)).hexdigest()
-            pieces_hash = hashlib.sha1(pieces).hexdigest()
+            info_hash = hashlib.sha1(bencode(info)).digest()
+            pieces_hash = hashlib.sha1(pieces).digest()
             local_tor = TorInfo(info_hash=info_hash, pieces_hash=pieces_hash)
             # 从种子中获取 announce, qb可能存在获取不到的情况，会存在于fastresume文件中
             if "announce" in torrent:
@@ -109,11 +155,19 @@ class TorInfo:
         except Exception as err:
             return None, str(err)
 
-    def get_name_id_tag(self):
-        return f"{self.site_name}:{self.torrent_id}"
+    def get_name_id_tag(self) -> str:
+        """
+        站点+种子ID，用于辅种缓存，首次使用时生成
+        """
+        if self._name_id_tag is None:
+            self._name_id_tag = f"{self._site_name}:{self.torrent_id}"
+        return self._name_id_tag
 
-    def get_name_pieces_tag(self):
-        return f"{self.site_name}:{self.pieces_hash}"
+    def get_name_pieces_key(self) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        站点+二进制pieces_hash，用于判断站点种子是否已在下载器中
+        """
+        return self._site_name, self._pieces_hash
 
 
 class CrossSeedHelper(object):
@@ -171,6 +225,202 @@ class CrossSeedHelper(object):
         return remote_torrent_infos, None
 
 
+class TorrentMetaCache(object):
+    """
+    种子文件解析结果缓存，按路径记录文件大小和修改时间，文件未变化时不再重复解析
+    从qBittorrent远程导出的种子按"qb:下载器:种子hash"记录，导出失败的种子也会记录，过期后再重试
+    """
+    _export_prefix = "qb:"
+    # 导出失败记录的有效期（秒）
+    _export_error_ttl = 24 * 3600
+
+    def __init__(self, data: Optional[dict] = None) -> None:
+        # {种子路径: {"size", "mtime", "info_hash", "pieces_hash", "announce"}}
+        # 导出条目额外记录"downloader"，导出失败时只记录"downloader", "error", "time"
+        self._entries: Dict[str, dict] = data if isinstance(data, dict) else {}
+        # 本次运行用到的种子路径
+        self._seen = set()
+        # 本次运行已获取种子列表的下载器，只清理这些下载器的导出条目
+        self._listed_downloaders = set()
+        self.dirty = False
+        # 解析及使用缓存的种子数
+        self.parsed = 0
+        self.cached = 0
+
+    def get(self, torrent_path: Path) -> Tuple[Optional[TorInfo], str]:
+        """
+        获取种子信息，文件大小和修改时间未变化时直接使用缓存
+        """
+        key = str(torrent_path)
+        self._seen.add(key)
+        try:
+            stat = os.stat(key)
+        except OSError as err:
+            return None, str(err)
+        entry = self._entries.get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns:
+            self.cached += 1
+            return self.__to_tor_info(key, entry), ""
+        local_tor, err = CrossSeedHelper.get_local_torrent_info(torrent_path)
+        if not local_tor:
+            return None, err
+        self.parsed += 1
+        self.__put(key, local_tor, size=stat.st_size, mtime=stat.st_mtime_ns)
+        return local_tor, ""
+
+    def mark_listed(self, downloader: str):
+        """
+        记录本次已获取种子列表的下载器
+        """
+        self._listed_downloaders.add(downloader)
+
+    def __export_key(self, downloader: str, hash_str: str) -> str:
+        return f"{self._export_prefix}{downloader}:{hash_str}"
+
+    def get_exported(self, downloader: str, hash_str: str) -> Tuple[Optional[TorInfo], Optional[str]]:
+        """
+        获取已远程导出过的种子信息，同一种子hash的内容不会变化，无需校验
+        :return: 种子信息、未过期的导出失败原因，均为None时表示未缓存
+        """
+        key = self.__export_key(downloader, hash_str)
+        self._seen.add(key)
+        entry = self._entries.get(key)
+        if not entry:
+            return None, None
+        if entry.get("error"):
+            if (entry.get("time") or 0) + self._export_error_ttl < time.time():
+                return None, None
+            return None, entry.get("error")
+        self.cached += 1
+        return self.__to_tor_info(None, entry), None
+
+    def put_exported(self, downloader: str, hash_str: str, data: bytes) -> Tuple[Optional[TorInfo], str]:
+        """
+        解析远程导出的种子内容并加入缓存，解析失败时记录为导出失败
+        """
+        local_tor, err = TorInfo.from_data(data)
+        if not local_tor:
+            self.put_export_error(downloader, hash_str, err)
+            return None, err
+        self.parsed += 1
+        key = self.__export_key(downloader, hash_str)
+        self._seen.add(key)
+        self.__put(key, local_tor)
+        self._entries[key]["downloader"] = downloader
+        return local_tor, ""
+
+    def put_export_error(self, downloader: str, hash_str: str, err: str):
+        """
+        记录导出失败的种子，有效期内不再重复导出
+        """
+        key = self.__export_key(downloader, hash_str)
+        self._seen.add(key)
+        self._entries[key] = {
+            "downloader": downloader,
+            "error": err or "未获取到种子内容",
+            "time": int(time.time())
+        }
+        self.dirty = True
+
+    @staticmethod
+    def __to_tor_info(torrent_path: Optional[str], entry: dict) -> TorInfo:
+        """
+        缓存条目转为种子信息
+        """
+        local_tor = TorInfo.local(torrent_path=torrent_path,
+                                  info_hash=entry.get("info_hash"),
+                                  pieces_hash=entry.get("pieces_hash"))
+        local_tor.torrent_announce = entry.get("announce")
+        return local_tor
+
+    def __put(self, key: str, local_tor: TorInfo, size: int = None, mtime: int = None):
+        """
+        记录种子解析结果
+        """
+        announce = local_tor.torrent_announce
+        if isinstance(announce, bytes):
+            announce = announce.decode("utf-8", errors="ignore")
+        self._entries[key] = {
+            "size": size,
+            "mtime": mtime,
+            "info_hash": local_tor.info_hash,
+            "pieces_hash": local_tor.pieces_hash,
+            "announce": announce
+        }
+        self.dirty = True
+
+    def __is_stale(self, key: str) -> bool:
+        """
+        本次未用到的条目是否需要清理，导出条目只清理本次已获取种子列表的下载器的，旧版本未记录下载器的导出条目一并清理
+        """
+        if not key.startswith(self._export_prefix):
+            return not os.path.exists(key)
+        downloader = self._entries[key].get("downloader")
+        if downloader is None:
+            return bool(self._listed_downloaders)
+        return downloader in self._listed_downloaders
+
+    def to_dict(self) -> dict:
+        """
+        导出缓存，移除种子文件已不存在及本次未出现在下载器中的导出条目
+        """
+        removed = [key for key in self._entries if key not in self._seen and self.__is_stale(key)]
+        for key in removed:
+            self._entries.pop(key)
+        if removed:
+            self.dirty = True
+        return self._entries
+
+
+class TrackerSiteIndex(object):
+    """
+    tracker地址到站点名称的索引，每次辅种开始时构建，同一tracker地址只解析一次
+    """
+
+    def __init__(self, site_configs: List[CSSiteConfig]) -> None:
+        # {passkey: 站点名称}
+        self._passkeys: Dict[str, str] = {}
+        for site_config in site_configs:
+            if site_config.passkey:
+                self._passkeys.setdefault(site_config.passkey, site_config.name)
+        # {tracker地址: 站点名称}，未识别的记录为None
+        self._trackers: Dict[str, Optional[str]] = {}
+        # {tracker域名: 站点名称}
+        self._domains: Dict[str, Optional[str]] = {}
+
+    def __match_passkey(self, tracker: str) -> Optional[str]:
+        """
+        通过passkey匹配站点，先按地址中的各段精确查找，找不到时再做包含匹配
+        """
+        for part in re.split(r"[/?&=]", tracker):
+            if part in self._passkeys:
+                return self._passkeys[part]
+        for passkey, site_name in self._passkeys.items():
+            if passkey in tracker:
+                return site_name
+        return None
+
+    def __match_domain(self, tracker: str) -> Optional[str]:
+        """
+        通过tracker域名匹配站点
+        """
+        tracker_domain = StringUtils.get_url_domain(tracker)
+        if tracker_domain not in self._domains:
+            site_info = SitesHelper().get_indexer(tracker_domain)
+            self._domains[tracker_domain] = site_info.get("name") if site_info else None
+        return self._domains[tracker_domain]
+
+    def get_site_name(self, tracker: str) -> Optional[str]:
+        """
+        获取tracker地址对应的站点名称，优先通过passkey识别
+        """
+        if not tracker:
+            return None
+        if tracker not in self._trackers:
+            self._trackers[tracker] = self.__match_passkey(tracker) or self.__match_domain(tracker)
+        return self._trackers[tracker]
+
+
 class CrossSeed(_PluginBase):
     # 插件名称
     plugin_name = "青蛙辅种助手"
@@ -179,7 +429,7 @@ class CrossSeed(_PluginBase):
     # 插件图标
     plugin_icon = "qingwa.png"
     # 插件版本
-    plugin_version = "3.0.1"
+    plugin_version = "3.0.7"
     # 插件作者
     plugin_author = "233@qingwa"
     # 作者主页
@@ -213,13 +463,19 @@ class CrossSeed(_PluginBase):
     _recheck_torrents = {}
     _is_recheck_running = False
     # 辅种缓存，出错的种子不再重复辅种，可清除
-    _error_caches = []
+    _error_caches = set()
     # 辅种缓存，辅种成功的种子，可清除
-    _success_caches = []
+    _success_caches = set()
     # 辅种缓存，出错的种子不再重复辅种，且无法清除。种子被删除404等情况
-    _permanent_error_caches = []
+    _permanent_error_caches = set()
     _torrentpaths = []
     _site_cs_infos = []
+    # 同时查询的站点数
+    _query_workers = 4
+    # 查询结果队列长度，查询快于下载时查询线程等待
+    _candidate_queue_size = 1000
+    # 同时从qBittorrent远程导出种子的线程数
+    _export_workers = 4
     # 辅种计数
     total = 0
     realtotal = 0
@@ -245,9 +501,9 @@ class CrossSeed(_PluginBase):
             self._nolabels = config.get("nolabels")
             self._nopaths = config.get("nopaths")
             self._clearcache = config.get("clearcache")
-            self._permanent_error_caches = [] if self._clearcache else config.get("permanent_error_caches") or []
-            self._error_caches = [] if self._clearcache else config.get("error_caches") or []
-            self._success_caches = [] if self._clearcache else config.get("success_caches") or []
+            self._permanent_error_caches = set() if self._clearcache else set(config.get("permanent_error_caches") or [])
+            self._error_caches = set() if self._clearcache else set(config.get("error_caches") or [])
+            self._success_caches = set() if self._clearcache else set(config.get("success_caches") or [])
 
             # 过滤掉已删除的站点
             inner_site_list = SiteOper().list_order_by_pri()
@@ -751,9 +1007,9 @@ class CrossSeed(_PluginBase):
             "notify": self._notify,
             "nolabels": self._nolabels,
             "nopaths": self._nopaths,
-            "success_caches": self._success_caches,
-            "error_caches": self._error_caches,
-            "permanent_error_caches": self._permanent_error_caches
+            "success_caches": list(self._success_caches),
+            "error_caches": list(self._error_caches),
+            "permanent_error_caches": list(self._permanent_error_caches)
         })
 
     def auto_seed(self):
@@ -772,6 +1028,10 @@ class CrossSeed(_PluginBase):
         self.exist = 0
         self.fail = 0
         self.cached = 0
+        # 种子文件解析缓存
+        meta_cache = TorrentMetaCache(self.get_data("torrent_meta"))
+        # tracker对应站点索引
+        tracker_index = TrackerSiteIndex(self._site_cs_infos)
         # 扫描下载器辅种
         for idx, service in enumerate(self.service_infos.values()):
             downloader = service.name
@@ -784,70 +1044,19 @@ class CrossSeed(_PluginBase):
             else:
                 logger.info(f"下载器 {downloader} 没有已完成种子")
                 continue
-            hash_strs = []
+            meta_cache.mark_listed(downloader)
+            # 先按缓存、不辅种目录及标签过滤，不需要辅种的种子不再导出和解析
+            seed_torrents = []
             for torrent in torrents:
                 if self._event.is_set():
                     logger.info("辅种服务停止")
                     return
-                    # 获取种子hash
+                # 获取种子hash
                 hash_str = self.__get_hash(torrent, service.type)
                 if hash_str in self._error_caches or hash_str in self._permanent_error_caches:
                     logger.info(f"种子 {hash_str} 辅种失败且已缓存，跳过 ...")
                     continue
                 save_path = self.__get_save_path(torrent, service.type)
-                # 获取种子文件路径
-                torrent_path = Path(self._torrentpaths[idx]) / f"{hash_str}.torrent"
-                torrent_info = None
-                if not torrent_path.exists():
-                    if False and service.type == "qbittorrent":
-                        # qb开启SQLite功能后将不再以hash命名的方式保存torrent文件
-                        # TODO 导出功能需要qb4.5.0以上版本才支持
-                        logger.warn(f"QB种子文件不存在：{torrent_path} 尝试远程导出种子")
-                        try:
-                            torrent_data = torrent.export()
-                            torrent_info, err = TorInfo.from_data(torrent_data)
-                        except Exception as e:
-                            err = str(e)
-                        if not torrent_info:
-                            logger.error(f"尝试远程导出种子 {hash_str} 出错 {err}")
-                            continue
-                    else:
-                        logger.error(f"种子文件不存在：{torrent_path}")
-                        continue
-
-                # 读取种子文件具体信息
-                if not torrent_info:
-                    torrent_info, err = self.cross_helper.get_local_torrent_info(torrent_path)
-                    if not torrent_info:
-                        logger.error(f"未能读取到种子文件具体信息：{torrent_path} {err}")
-                        continue
-
-                # 用站点+pieces_hash记录该站点是否已经在该下载器中,需要从tracker补充站点名字
-                tracker_urls = set()
-                try:
-                    if service.type == "qbittorrent":
-                        for i in torrent.trackers:
-                            if "https" in i.get("url"):
-                                tracker_urls.add(i.get("url"))
-                    elif service.type == "transmission":
-                        if torrent_info and torrent_info.torrent_announce:
-                            if "https" in torrent_info.torrent_announce:
-                                tracker_urls.add(torrent_info.torrent_announce)
-                except Exception as err:
-                    logger.warn(f"尝试获取 {downloader} 的tracker出错 {err}")
-                # 根据tracker补充站点信息
-                for tracker in tracker_urls:
-                    # 优先通过passkey获取站点名
-                    for site_config in self._site_cs_infos:
-                        if site_config.passkey in tracker:
-                            torrent_info.site_name = site_config.name
-                            break
-                    if not torrent_info.site_name:
-                        # 尝试通过域名获取站点信息
-                        tracker_domain = StringUtils.get_url_domain(tracker)
-                        site_info = SitesHelper().get_indexer(tracker_domain)
-                        if site_info:
-                            torrent_info.site_name = site_info.get("name")
 
                 if self._nopaths and save_path:
                     # 过滤不需要转移的路径
@@ -871,6 +1080,47 @@ class CrossSeed(_PluginBase):
                             break
                     if is_skip:
                         continue
+                seed_torrents.append((hash_str, save_path, torrent))
+            # qb开启SQLite功能后将不再以hash命名的方式保存torrent文件，缺少的种子文件远程导出
+            exported_infos = {}
+            if service.type == "qbittorrent":
+                exported_infos = self.__export_torrents(service=service,
+                                                        torrents=[torrent for _, _, torrent in seed_torrents],
+                                                        torrent_dir=Path(self._torrentpaths[idx]),
+                                                        meta_cache=meta_cache)
+            hash_strs = []
+            for hash_str, save_path, torrent in seed_torrents:
+                if self._event.is_set():
+                    logger.info("辅种服务停止")
+                    return
+                # 获取种子文件路径
+                torrent_path = Path(self._torrentpaths[idx]) / f"{hash_str}.torrent"
+                torrent_info = None
+                if not torrent_path.exists():
+                    torrent_info = exported_infos.get(hash_str)
+                    if not torrent_info:
+                        # qb导出失败时已记录日志
+                        if service.type != "qbittorrent":
+                            logger.error(f"种子文件不存在：{torrent_path}")
+                        continue
+
+                # 读取种子文件具体信息
+                if not torrent_info:
+                    torrent_info, err = meta_cache.get(torrent_path)
+                    if not torrent_info:
+                        logger.error(f"未能读取到种子文件具体信息：{torrent_path} {err}")
+                        continue
+
+                # 用站点+pieces_hash记录该站点是否已经在该下载器中,需要从tracker补充站点名字
+                tracker_urls = self.__get_trackers(torrent=torrent,
+                                                   dl_type=service.type,
+                                                   torrent_info=torrent_info)
+                # 根据tracker补充站点信息
+                for tracker in tracker_urls:
+                    torrent_info.site_name = tracker_index.get_site_name(tracker)
+                    if torrent_info.site_name:
+                        break
+
                 hash_strs.append({
                     "hash": hash_str,
                     "save_path": save_path,
@@ -882,6 +1132,11 @@ class CrossSeed(_PluginBase):
                 self.check_recheck()
             else:
                 logger.info("没有需要辅种的种子")
+        # 保存种子文件解析缓存
+        logger.info(f"种子文件解析：{meta_cache.parsed}，使用缓存：{meta_cache.cached}")
+        meta_data = meta_cache.to_dict()
+        if meta_cache.dirty:
+            self.save_data("torrent_meta", meta_data)
         # 保存缓存
         self.__update_config()
         # 发送消息
@@ -949,6 +1204,66 @@ class CrossSeed(_PluginBase):
             logger.info(f"下载器 {downloader} 中没有需要检查的校验任务，清空待处理列表 ...")
             self._recheck_torrents[downloader] = []
 
+    def __export_torrents(self, service: ServiceInfo, torrents: List[Any], torrent_dir: Path,
+                          meta_cache: TorrentMetaCache) -> Dict[str, TorInfo]:
+        """
+        从qBittorrent远程导出种子目录中不存在的种子，需要qb4.5.0以上版本
+        :return: {种子hash: 种子信息}
+        """
+        exported_infos = {}
+        missing_torrents = []
+        # 此前导出失败且未过期的种子数
+        failed_cnt = 0
+        for torrent in torrents:
+            hash_str = self.__get_hash(torrent, service.type)
+            if not hash_str or hash_str in self._error_caches or hash_str in self._permanent_error_caches:
+                continue
+            if (torrent_dir / f"{hash_str}.torrent").exists():
+                continue
+            torrent_info, export_err = meta_cache.get_exported(service.name, hash_str)
+            if torrent_info:
+                exported_infos[hash_str] = torrent_info
+            elif export_err:
+                failed_cnt += 1
+            else:
+                missing_torrents.append((hash_str, torrent))
+        if failed_cnt:
+            logger.info(f"下载器 {service.name} 有 {failed_cnt} 个种子此前远程导出失败，暂不重试")
+        if not missing_torrents:
+            return exported_infos
+        logger.info(f"下载器 {service.name} 有 {len(missing_torrents)} 个种子文件不存在，尝试远程导出种子 ...")
+
+        def __export(_torrent: Any) -> Optional[bytes]:
+            if self._event.is_set():
+                return None
+            return _torrent.export()
+
+        fail_cnt = 0
+        with ThreadPoolExecutor(max_workers=self._export_workers) as executor:
+            futures = {executor.submit(__export, torrent): hash_str for hash_str, torrent in missing_torrents}
+            for future in as_completed(futures):
+                hash_str = futures[future]
+                try:
+                    torrent_data = future.result()
+                except Exception as err:
+                    torrent_data, err_msg = None, str(err)
+                else:
+                    err_msg = "" if torrent_data else "未获取到种子内容"
+                if self._event.is_set():
+                    continue
+                torrent_info = None
+                if torrent_data:
+                    torrent_info, err_msg = meta_cache.put_exported(service.name, hash_str, torrent_data)
+                else:
+                    meta_cache.put_export_error(service.name, hash_str, err_msg)
+                if torrent_info:
+                    exported_infos[hash_str] = torrent_info
+                else:
+                    fail_cnt += 1
+                    logger.error(f"尝试远程导出种子 {hash_str} 出错 {err_msg}")
+        logger.info(f"下载器 {service.name} 远程导出种子完成，失败 {fail_cnt} 个")
+        return exported_infos
+
     def __seed_torrents(self, hash_strs: list, service: ServiceInfo):
         """
         执行所有种子的辅种
@@ -957,87 +1272,143 @@ class CrossSeed(_PluginBase):
             return
         logger.info(f"下载器 {service.name} 开始查询辅种，种子总数量：{len(hash_strs)} ...")
 
-        # 每个Hash的保存目录
+        # 每个二进制pieces_hash的保存目录
         save_paths = {}
-        pieces_hash_set = set()
         site_pieces_hash_set = set()
         for item in hash_strs:
             tor_info: TorInfo = item.get("torrent_info")
-            save_paths[tor_info.pieces_hash] = item.get("save_path")
-            pieces_hash_set.add(tor_info.pieces_hash)
+            if not tor_info.pieces_digest:
+                continue
+            save_paths[tor_info.pieces_digest] = item.get("save_path")
             if tor_info.site_name:
-                site_pieces_hash_set.add(tor_info.get_name_pieces_tag())
+                site_pieces_hash_set.add(tor_info.get_name_pieces_key())
 
-        logger.info(f"去重后，总共需要辅种查询的种子数：{len(pieces_hash_set)}")
-        pieces_hashes = list(pieces_hash_set)
+        logger.info(f"去重后，总共需要辅种查询的种子数：{len(save_paths)}")
+        # 仅在提交站点查询时转换为十六进制
+        pieces_hashes = [pieces_digest.hex() for pieces_digest in save_paths]
 
-        # 分站点逐个批次辅种
-        # 逐个站点查询可辅种数据
-        chunk_size = 100
+        # 各站点并发查询可辅种数据，每个站点仍按自身的查询间隔分批查询
+        site_configs = []
         for site_config in self._site_cs_infos:
             # 检查站点是否已经停用
             db_site = SiteOper().get(site_config.id)
             if db_site and not db_site.is_active:
                 logger.info(f"站点{site_config.name}已停用，跳过辅种")
                 continue
-            remote_tors: List[TorInfo] = []
-            total_size = len(pieces_hashes)
-            for i in range(0, len(pieces_hashes), chunk_size):
-                if self._event.is_set():
-                    logger.info("辅种服务停止")
-                    return
-                # 切片操作
-                chunk = pieces_hashes[i:i + chunk_size]
-                # 处理分组
-                chunk_tors, err_msg = self.cross_helper.get_target_torrent(site_config, chunk)
-                if not chunk_tors and err_msg:
-                    logger.info(
-                        f"查询站点{site_config.name}可辅种的信息出错 {err_msg},进度={i + 1}/{total_size}"
-                    )
-                else:
-                    logger.info(
-                        f"站点{site_config.name}本批次的可辅种/查询数={len(chunk_tors)}/{len(chunk)},进度={i + 1}/{total_size}"
-                    )
-                    remote_tors = remote_tors + chunk_tors
-
-            logger.info(f"站点{site_config.name}返回可以辅种的种子总数为{len(remote_tors)}")
-
-            # 去除已经下载过的种子
-            local_cnt = 0
-            not_local_tors = []
-            for tor_info in remote_tors:
-                if (
-                        tor_info
-                        and tor_info.site_name
-                        and tor_info.pieces_hash
-                        and tor_info.get_name_pieces_tag() in site_pieces_hash_set
-                ):
-                    local_cnt = local_cnt + 1
-                else:
-                    not_local_tors.append(tor_info)
-            logger.info(f"站点{site_config.name}正在做种或已经辅种过的种子数为{local_cnt}")
+            site_configs.append(site_config)
+        if not site_configs:
+            return
+        # 查询线程逐批放入可辅种的种子，查询结束时放入None
+        candidates: Queue = Queue(maxsize=self._candidate_queue_size)
+        # 处理线程退出后通知查询线程停止，避免阻塞在已满的队列上
+        stop_event = Event()
 
-            for tor_info in not_local_tors:
-                if self._event.is_set():
-                    logger.info("辅种服务停止")
-                    return
-                if not tor_info:
-                    continue
-                if not tor_info.torrent_id or not tor_info.pieces_hash:
-                    continue
-                if tor_info.get_name_id_tag() in self._success_caches:
-                    logger.info(f"{tor_info.get_name_id_tag()} 已处理过辅种，跳过 ...")
-                    continue
-                if tor_info.get_name_id_tag() in self._error_caches or tor_info.get_name_id_tag() in self._permanent_error_caches:
-                    logger.info(f"种子 {tor_info.get_name_id_tag()} 辅种失败且已缓存，跳过 ...")
+        def __put(item: tuple) -> bool:
+            while not stop_event.is_set():
+                try:
+                    candidates.put(item, timeout=1)
+                    return True
+                except Full:
                     continue
-                # 添加任务
-                self.__download_torrent(tor=tor_info, site_config=site_config,
-                                        service=service,
-                                        save_path=save_paths.get(tor_info.pieces_hash))
+            return False
+
+        def __query_worker(_site_config: CSSiteConfig):
+            try:
+                for _tor_info in self.__iter_site_torrents(_site_config, pieces_hashes):
+                    if not __put((_site_config, _tor_info)):
+                        return
+            except Exception as err:
+                logger.error(f"查询站点{_site_config.name}可辅种的信息出错 {err}")
+            finally:
+                __put((_site_config, None))
+
+        # 各站点统计：返回可辅种数、已在做种数
+        site_stats = {site_config.name: [0, 0] for site_config in site_configs}
+        with ThreadPoolExecutor(max_workers=min(self._query_workers, len(site_configs))) as executor:
+            for site_config in site_configs:
+                executor.submit(__query_worker, site_config)
+            pending = len(site_configs)
+            try:
+                # 边查询边下载，不保留完整的查询结果
+                while pending:
+                    site_config, tor_info = candidates.get()
+                    if tor_info is None:
+                        pending -= 1
+                        remote_cnt, local_cnt = site_stats[site_config.name]
+                        logger.info(f"站点{site_config.name}返回可以辅种的种子总数为{remote_cnt}，"
+                                    f"正在做种或已经辅种过的种子数为{local_cnt}")
+                        continue
+                    if self._event.is_set():
+                        # 等待查询线程退出
+                        continue
+                    site_stats[site_config.name][0] += 1
+                    # 去除已经下载过的种子
+                    if tor_info.get_name_pieces_key() in site_pieces_hash_set:
+                        site_stats[site_config.name][1] += 1
+                        continue
+                    try:
+                        self.__seed_site_torrent(site_config=site_config,
+                                                 tor_info=tor_info,
+                                                 service=service,
+                                                 save_paths=save_paths)
+                    except Exception as e:
+                        logger.error(f"站点{site_config.name}辅种{tor_info.get_name_id_tag()}出错 {e}")
+            finally:
+                # 通知查询线程停止并清空队列，确保线程池能正常退出
+                stop_event.set()
+                while True:
+                    try:
+                        candidates.get_nowait()
+                    except Empty:
+                        break
+        if self._event.is_set():
+            logger.info("辅种服务停止")
+            return
 
         logger.info(f"下载器 {service.name} 辅种完成")
 
+    def __iter_site_torrents(self, site_config: CSSiteConfig, pieces_hashes: List[str]) -> Iterator[TorInfo]:
+        """
+        分批查询单个站点的可辅种数据，逐批返回，在查询线程中执行
+        """
+        chunk_size = 100
+        total_size = len(pieces_hashes)
+        for i in range(0, len(pieces_hashes), chunk_size):
+            if self._event.is_set():
+                return
+            # 切片操作
+            chunk = pieces_hashes[i:i + chunk_size]
+            # 处理分组
+            chunk_tors, err_msg = self.cross_helper.get_target_torrent(site_config, chunk)
+            if not chunk_tors and err_msg:
+                logger.info(
+                    f"查询站点{site_config.name}可辅种的信息出错 {err_msg},进度={i + 1}/{total_size}"
+                )
+            else:
+                logger.info(
+                    f"站点{site_config.name}本批次的可辅种/查询数={len(chunk_tors)}/{len(chunk)},进度={i + 1}/{total_size}"
+                )
+                yield from chunk_tors
+
+    def __seed_site_torrent(self, site_config: CSSiteConfig, tor_info: TorInfo,
+                            service: ServiceInfo, save_paths: dict):
+        """
+        按缓存过滤并下载站点返回的单个可辅种种子
+        """
+        if not tor_info.torrent_id or not tor_info.pieces_digest:
+            return
+        name_id_tag = tor_info.get_name_id_tag()
+        if name_id_tag in self._success_caches:
+            logger.info(f"{name_id_tag} 已处理过辅种，跳过 ...")
+            return
+        if name_id_tag in self._error_caches or name_id_tag in self._permanent_error_caches:
+            logger.info(f"种子 {name_id_tag} 辅种失败且已缓存，跳过 ...")
+            return
+        # 添加任务
+        self.__download_torrent(tor=tor_info, site_config=site_config,
+                                service=service,
+                                save_path=save_paths.get(tor_info.pieces_digest))
+
     @staticmethod
     def __download(service: ServiceInfo, content: Union[bytes, str],
                    save_path: str) -> Optional[str]:
@@ -1106,10 +1477,10 @@ class CrossSeed(_PluginBase):
             self.cached += 1
             # 加入失败缓存
             if error_msg and ('无法打开链接' in error_msg or '触发站点流控' in error_msg):
-                self._error_caches.append(tor.get_name_id_tag())
+                self._error_caches.add(tor.get_name_id_tag())
             else:
                 # 种子不存在的情况
-                self._permanent_error_caches.append(tor.get_name_id_tag())
+                self._permanent_error_caches.add(tor.get_name_id_tag())
             logger.error(f"下载种子文件失败：{tor.get_name_id_tag()}")
             return False
 
@@ -1120,7 +1491,7 @@ class CrossSeed(_PluginBase):
             tors, msg = downloader_obj.get_torrents(ids=[tmp_tor_info.info_hash])
             if tors:
                 self.exist += 1
-                self._success_caches.append(tor.get_name_id_tag())
+                self._success_caches.add(tor.get_name_id_tag())
                 logger.info(f"下载的种子{tor.get_name_id_tag()}已存在, 跳过")
                 return True
         else:
@@ -1136,7 +1507,7 @@ class CrossSeed(_PluginBase):
             self.fail += 1
             self.cached += 1
             # 加入失败缓存
-            self._error_caches.append(tor.get_name_id_tag())
+            self._error_caches.add(tor.get_name_id_tag())
             return False
         else:
             self.success += 1
@@ -1149,7 +1520,7 @@ class CrossSeed(_PluginBase):
             # 下载成功
             logger.info(f"成功添加辅种下载，站点种子：{tor.get_name_id_tag()}")
             # 成功也加入缓存，有一些改了路径校验不通过的，手动删除后，下一次又会辅上
-            self._success_caches.append(tor.get_name_id_tag())
+            self._success_caches.add(tor.get_name_id_tag())
             return True
 
     def __add_recheck_torrents(self, service: ServiceInfo, download_id: str):
@@ -1170,6 +1541,27 @@ class CrossSeed(_PluginBase):
             print(str(e))
             return ""
 
+    @staticmethod
+    def __get_trackers(torrent: Any, dl_type: str, torrent_info: TorInfo) -> List[str]:
+        """
+        获取种子的https tracker地址，qb优先使用种子列表中的当前tracker及种子文件中的announce，
+        都没有时才单独请求种子的tracker列表
+        """
+        tracker_urls = []
+        try:
+            announce = torrent_info.torrent_announce
+            if isinstance(announce, bytes):
+                announce = announce.decode("utf-8", errors="ignore")
+            if dl_type == "qbittorrent":
+                tracker_urls = [url for url in (torrent.get("tracker"), announce) if url]
+                if not any("https" in url for url in tracker_urls):
+                    tracker_urls = [tracker.get("url") for tracker in torrent.trackers]
+            elif announce:
+                tracker_urls = [announce]
+        except Exception as e:
+            print(str(e))
+        return [url for url in dict.fromkeys(tracker_urls) if url and "https" in url]
+
     @staticmethod
     def __get_label(torrent: Any, dl_type: str):
         """
@@ -1,15 +1,20 @@
-import os
+import hashlib
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from threading import Event
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import zip_longest
+from threading import Event, Lock, Semaphore
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from bencode import bdecode, bencode
 from lxml import etree
 from ruamel.yaml import CommentedMap
 
+from app import schemas
 from app.core.config import settings
 from app.core.event import eventmanager
 from app.db.site_oper import SiteOper
@@ -18,7 +23,10 @@ from app.helper.sites import SitesHelper
 from app.helper.torrent import TorrentHelper
 from app.log import logger
 from app.plugins import _PluginBase
+from app.plugins.iyuuautoseed.exclude_matcher import LabelMatcher, PathMatcher
 from app.plugins.iyuuautoseed.iyuu_helper import IyuuHelper
+from app.plugins.iyuuautoseed.seed_cache import SeedCache, SeedInfoCache
+from app.plugins.iyuuautoseed.seed_history import SeedHistory
 from app.schemas import NotificationType, ServiceInfo
 from app.schemas.types import EventType
 from app.utils.http import RequestUtils
@@ -33,7 +41,7 @@ class IYUUAutoSeed(_PluginBase):
     # 插件图标
     plugin_icon = "IYUU.png"
     # 插件版本
-    plugin_version = "2.14"
+    plugin_version = "2.24"
     # 插件作者
     plugin_author = "jxxghp,CKun"
     # 作者主页
@@ -48,6 +56,8 @@ class IYUUAutoSeed(_PluginBase):
     # 私有属性
     _scheduler = None
     iyuu_helper = None
+    # 辅种历史
+    _seed_history: Optional[SeedHistory] = None
     # 开关
     _enabled = False
     _cron = None
@@ -63,12 +73,19 @@ class IYUUAutoSeed(_PluginBase):
     _notify = False
     _nolabels = None
     _nopaths = None
+    # 预编译的不辅种目录及标签规则
+    _path_matcher = PathMatcher()
+    _label_matcher = LabelMatcher()
     _labelsafterseed = None
     _categoryafterseed = None
     _addhosttotag = False
     _size = None
     _clearcache = False
     _auto_start = False
+    # 种子文件下载线程数
+    _download_workers = 4
+    # 单站点同时下载数
+    _site_workers = 1
     # 退出事件
     _event = Event()
     # 种子链接xpaths
@@ -78,15 +95,40 @@ class IYUUAutoSeed(_PluginBase):
         "//a[contains(@href, 'download.php?id=')]/@href",
         "//a[@class='index'][contains(@href, '/dl/')]/@href",
     ]
-    # 待校全种子hash清单
+    # 等待校验的种子，{下载器名称: {hash: 加入时间}}
+    _recheck_queue = {}
+    # 校验中或校验完成待开始的种子，{下载器名称: {hash: 开始校验时间}}
     _recheck_torrents = {}
+    # 发起校验后超过等待时间仍不完整的种子，继续跟踪但不占用同时校验数，{下载器名称: {hash}}
+    _recheck_stalled = {}
+    # 校验通过已开始的种子数，{下载器名称: 数量}
+    _recheck_started = {}
+    _recheck_lock = Lock()
     _is_recheck_running = False
-    # 辅种缓存，出错的种子不再重复辅种，可清除
-    _error_caches = []
+    # 单个下载器同时校验的种子数
+    _recheck_count = 10
+    # 单个下载器同时校验的种子总大小(GB)，0为不限制
+    _recheck_size = 100
+    # 发起校验后多久仍不完整视为校验结束，不再占用同时校验数（秒）
+    _recheck_grace = 300
+    # 辅种缓存，出错的种子不再重复辅种，可清除，过期后重试
+    _error_caches: Optional[SeedCache] = None
     # 辅种缓存，辅种成功的种子，可清除
-    _success_caches = []
+    _success_caches: Optional[SeedCache] = None
     # 辅种缓存，出错的种子不再重复辅种，且无法清除。种子被删除404等情况
-    _permanent_error_caches = []
+    _permanent_error_caches: Optional[SeedCache] = None
+    # IYUU辅种查询结果缓存
+    _seed_info_caches: Optional[SeedInfoCache] = None
+    # IYUU辅种查询结果缓存时间（小时），0为不缓存
+    _query_cache_hours = 24
+    # 出错缓存过期时间（秒）
+    _error_cache_ttl = 7 * 24 * 3600
+    # 单个缓存最大条目数
+    _cache_max_size = 200000
+    # 所有下载器的种子Hash索引，每次辅种开始时构建，{hash: 下载器名称}
+    _hash_index = {}
+    # 已成功建立索引的下载器
+    _indexed_downloaders = set()
     # 辅种计数
     total = 0
     realtotal = 0
@@ -94,6 +136,11 @@ class IYUUAutoSeed(_PluginBase):
     exist = 0
     fail = 0
     cached = 0
+    # 通过索引节省的下载器查询次数
+    rpc_saved = 0
+    # IYUU查询的种子数及命中缓存数
+    query_total = 0
+    query_cached = 0
 
     def init_plugin(self, config: dict = None):
 
@@ -110,6 +157,8 @@ class IYUUAutoSeed(_PluginBase):
             self._notify = config.get("notify")
             self._nolabels = config.get("nolabels")
             self._nopaths = config.get("nopaths")
+            self._path_matcher = PathMatcher(self._nopaths)
+            self._label_matcher = LabelMatcher(self._nolabels)
             self._labelsafterseed = config.get("labelsafterseed") if config.get("labelsafterseed") else "已整理,辅种"
             self._categoryafterseed = config.get("categoryafterseed")
             self._auto_category = config.get("auto_category")
@@ -117,9 +166,14 @@ class IYUUAutoSeed(_PluginBase):
             self._addhosttotag = config.get("addhosttotag")
             self._size = float(config.get("size")) if config.get("size") else 0
             self._clearcache = config.get("clearcache")
-            self._permanent_error_caches = [] if self._clearcache else config.get("permanent_error_caches") or []
-            self._error_caches = [] if self._clearcache else config.get("error_caches") or []
-            self._success_caches = [] if self._clearcache else config.get("success_caches") or []
+            self._download_workers = self.__to_positive_int(config.get("download_workers"), 4)
+            self._site_workers = self.__to_positive_int(config.get("site_workers"), 1)
+            self._recheck_count = self.__to_positive_int(config.get("recheck_count"), 10)
+            self._recheck_size = float(config.get("recheck_size")) \
+                if str(config.get("recheck_size") or "").strip() else 100
+            self._query_cache_hours = float(config.get("query_cache_hours")) \
+                if str(config.get("query_cache_hours") or "").strip() else 24
+            self.__init_caches(config=config)
 
             # 过滤掉已删除的站点
             all_sites = [site.id for site in SiteOper().list_order_by_pri()] + [site.get("id") for site in
@@ -130,9 +184,17 @@ class IYUUAutoSeed(_PluginBase):
         # 停止现有任务
         self.stop_service()
 
+        # 辅种历史
+        self._seed_history = SeedHistory(self.get_data_path() / "seed_history.db")
+
+        # 恢复重启前未完成的校验任务
+        self.__load_recheck_tasks()
+
         # 启动定时任务 & 立即运行一次
         if self.get_state() or self._onlyonce:
-            self.iyuu_helper = IyuuHelper(token=self._token)
+            self.iyuu_helper = IyuuHelper(token=self._token,
+                                          loader=lambda key: self.get_data(key=key),
+                                          saver=lambda key, value: self.save_data(key=key, value=value))
             self._scheduler = BackgroundScheduler(timezone=settings.TZ)
 
             if self._onlyonce:
@@ -210,7 +272,34 @@ class IYUUAutoSeed(_PluginBase):
         pass
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        """
+        获取插件API
+        """
+        return [{
+            "path": "/history",
+            "endpoint": self.get_history,
+            "methods": ["GET"],
+            "summary": "查询辅种历史",
+            "description": "按源种子Hash、下载器、站点分页查询辅种历史",
+        }]
+
+    def get_history(self, apikey: str, hash_str: str = None, downloader: str = None, site: str = None,
+                    page: int = 1, count: int = 50) -> schemas.Response:
+        """
+        分页查询辅种历史
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        if not self._seed_history:
+            return schemas.Response(success=False, message="辅种历史未初始化")
+        total, items = self._seed_history.query(hash_str=hash_str, downloader=downloader, site=site,
+                                                page=page, count=count)
+        return schemas.Response(success=True, data={
+            "total": total,
+            "page": page,
+            "count": count,
+            "items": items
+        })
 
     def get_service(self) -> List[Dict[str, Any]]:
         """
@@ -419,6 +508,111 @@ class IYUUAutoSeed(_PluginBase):
                             }
                         ]
                     },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'download_workers',
+                                            'label': '种子下载线程数',
+                                            'placeholder': '同时下载种子文件的线程数，默认4',
+                                            'type': 'number',
+                                            "min": "1"
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'site_workers',
+                                            'label': '单站点同时下载数',
+                                            'placeholder': '同一站点同时下载种子文件的数量，默认1',
+                                            'type': 'number',
+                                            "min": "1"
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'query_cache_hours',
+                                            'label': 'IYUU查询缓存时间(小时)',
+                                            'placeholder': '缓存期内不再重复查询，0为不缓存，默认24',
+                                            'type': 'number',
+                                            "min": "0"
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'recheck_count',
+                                            'label': '同时校验种子数',
+                                            'placeholder': '单个下载器同时校验的种子数，默认10',
+                                            'type': 'number',
+                                            "min": "1"
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'recheck_size',
+                                            'label': '同时校验种子大小(GB)',
+                                            'placeholder': '单个下载器同时校验的种子总大小，0为不限制，默认100',
+                                            'type': 'number',
+                                            "min": "0"
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
                     {
                         'component': 'VRow',
                         'content': [
@@ -457,7 +651,7 @@ class IYUUAutoSeed(_PluginBase):
                                         'props': {
                                             'model': 'nolabels',
                                             'label': '不辅种标签',
-                                            'placeholder': '使用,分隔多个标签'
+                                            'placeholder': '使用,分隔多个标签，支持glob:开头的通配符及re:开头的正则'
                                         }
                                     }
                                 ]
@@ -508,7 +702,7 @@ class IYUUAutoSeed(_PluginBase):
                                             'model': 'nopaths',
                                             'label': '不辅种数据文件目录',
                                             'rows': 3,
-                                            'placeholder': '每一行一个目录'
+                                            'placeholder': '每一行一个目录，支持glob:开头的通配符及re:开头的正则'
                                         }
                                     }
                                 ]
@@ -648,11 +842,118 @@ class IYUUAutoSeed(_PluginBase):
             "nolabels": "",
             "labelsafterseed": "",
             "categoryafterseed": "",
-            "size": ""
+            "size": "",
+            "download_workers": 4,
+            "site_workers": 1,
+            "query_cache_hours": 24,
+            "recheck_count": 10,
+            "recheck_size": 100
         }
 
     def get_page(self) -> List[dict]:
-        pass
+        """
+        拼装插件详情页面，显示各下载器的校验进度及IYUU接口统计
+        """
+        with self._recheck_lock:
+            downloaders = list(dict.fromkeys(list(self._recheck_queue) + list(self._recheck_torrents)
+                                             + list(self._recheck_started)))
+            recheck_rows = [[
+                downloader,
+                len(self._recheck_queue.get(downloader) or {}),
+                len(self._recheck_torrents.get(downloader) or {}),
+                self._recheck_started.get(downloader) or 0
+            ] for downloader in downloaders]
+        metrics = self.iyuu_helper.get_metrics() if self.iyuu_helper else {}
+        metric_rows = [[
+            url,
+            int(metric.get("count")),
+            int(metric.get("errors")),
+            f'{metric.get("time") / metric.get("count"):.2f}s' if metric.get("count") else "-",
+            f'{metric.get("max_time"):.2f}s',
+            f'{metric.get("time"):.2f}s'
+        ] for url, metric in metrics.items()]
+        if not recheck_rows and not metric_rows:
+            return [
+                {
+                    'component': 'div',
+                    'text': '暂无数据',
+                    'props': {
+                        'class': 'text-center',
+                    }
+                }
+            ]
+        contents = []
+        if recheck_rows:
+            contents.append(self.__build_table(title='校验进度',
+                                               headers=['下载器', '等待校验', '校验中', '已开始'],
+                                               rows=recheck_rows))
+        if metric_rows:
+            contents.append(self.__build_table(title='IYUU接口统计',
+                                               headers=['接口', '请求数', '失败数', '平均耗时', '最大耗时', '总耗时'],
+                                               rows=metric_rows))
+        return contents
+
+    @staticmethod
+    def __build_table(title: str, headers: List[str], rows: List[list]) -> dict:
+        """
+        拼装详情页面表格
+        """
+        return {
+            'component': 'VRow',
+            'content': [
+                {
+                    'component': 'VCol',
+                    'props': {
+                        'cols': 12
+                    },
+                    'content': [
+                        {
+                            'component': 'VCardTitle',
+                            'text': title
+                        },
+                        {
+                            'component': 'VTable',
+                            'props': {
+                                'hover': True
+                            },
+                            'content': [
+                                {
+                                    'component': 'thead',
+                                    'content': [
+                                        {
+                                            'component': 'tr',
+                                            'content': [
+                                                {
+                                                    'component': 'th',
+                                                    'props': {
+                                                        'class': 'text-start ps-4'
+                                                    },
+                                                    'text': header
+                                                } for header in headers
+                                            ]
+                                        }
+                                    ]
+                                },
+                                {
+                                    'component': 'tbody',
+                                    'content': [
+                                        {
+                                            'component': 'tr',
+                                            'content': [
+                                                {
+                                                    'component': 'td',
+                                                    'text': value
+                                                } for value in row
+                                            ]
+                                        } for row in rows
+                                    ]
+                                }
+                            ]
+                        }
+                    ]
+                }
+            ]
+        }
 
     def __update_config(self):
         self.update_config({
@@ -674,16 +975,52 @@ class IYUUAutoSeed(_PluginBase):
             "auto_category": self._auto_category,
             "auto_start": self._auto_start,
             "size": self._size,
-            "success_caches": self._success_caches,
-            "error_caches": self._error_caches,
-            "permanent_error_caches": self._permanent_error_caches
+            "download_workers": self._download_workers,
+            "site_workers": self._site_workers,
+            "query_cache_hours": self._query_cache_hours,
+            "recheck_count": self._recheck_count,
+            "recheck_size": self._recheck_size
         })
 
+    def __init_caches(self, config: dict):
+        """
+        加载辅种缓存，旧版本保存在配置中的缓存迁移到插件数据目录的数据库中
+        """
+        db_path = self.get_data_path() / "seed_cache.db"
+        self._success_caches = SeedCache(name="success", db_path=db_path, max_size=self._cache_max_size)
+        self._error_caches = SeedCache(name="error", db_path=db_path, ttl=self._error_cache_ttl,
+                                       max_size=self._cache_max_size)
+        self._permanent_error_caches = SeedCache(name="permanent_error", db_path=db_path,
+                                                 max_size=self._cache_max_size)
+        self._seed_info_caches = SeedInfoCache(name="seed_info", db_path=db_path,
+                                               ttl=int(self._query_cache_hours * 3600),
+                                               max_size=self._cache_max_size)
+        self._seed_info_caches.load()
+        if self._clearcache or not self._query_cache_hours:
+            self._seed_info_caches.clear()
+        for cache, legacy_key in ((self._success_caches, "success_caches"),
+                                  (self._error_caches, "error_caches"),
+                                  (self._permanent_error_caches, "permanent_error_caches")):
+            cache.load(legacy=config.get(legacy_key))
+            if self._clearcache:
+                cache.clear()
+        self.__save_caches()
+
+    def __save_caches(self):
+        """
+        保存辅种缓存，只回写有变动的部分
+        """
+        for cache in (self._success_caches, self._error_caches, self._permanent_error_caches,
+                      self._seed_info_caches):
+            if cache:
+                cache.flush()
+
     def auto_seed(self):
         """
         开始辅种
         """
-        if not self.iyuu_helper or not self.service_infos:
+        service_infos = self.service_infos
+        if not self.iyuu_helper or not service_infos:
             return
         logger.info("开始辅种任务 ...")
 
@@ -694,80 +1031,33 @@ class IYUUAutoSeed(_PluginBase):
         self.exist = 0
         self.fail = 0
         self.cached = 0
-        # 扫描下载器辅种
-        for service in self.service_infos.values():
-            downloader = service.name
-            downloader_obj = service.instance
-            logger.info(f"开始扫描下载器 {downloader} ...")
-            # 获取下载器中已完成的种子
-            torrents = downloader_obj.get_completed_torrents()
-            if torrents:
-                logger.info(f"下载器 {downloader} 已完成种子数：{len(torrents)}")
-            else:
-                logger.info(f"下载器 {downloader} 没有已完成种子")
-                continue
-            hash_strs = []
-            for torrent in torrents:
+        self.rpc_saved = 0
+        self.query_total = 0
+        self.query_cached = 0
+        # 并发扫描所有下载器，构建种子Hash索引并汇总需要辅种的种子
+        hash_strs = self.__scan_downloaders(service_infos)
+        if self._event.is_set():
+            logger.info(f"辅种服务停止")
+            return
+        if hash_strs:
+            logger.info(f"总共需要辅种的种子数：{len(hash_strs)}")
+            # 分组处理，减少IYUU Api请求次数
+            chunk_size = 200
+            for i in range(0, len(hash_strs), chunk_size):
                 if self._event.is_set():
                     logger.info(f"辅种服务停止")
                     return
-                # 获取种子hash
-                hash_str = self.__get_hash(torrent=torrent, dl_type=service.type)
-                if hash_str in self._error_caches or hash_str in self._permanent_error_caches:
-                    logger.info(f"种子 {hash_str} 辅种失败且已缓存，跳过 ...")
-                    continue
-                save_path = self.__get_save_path(torrent=torrent, dl_type=service.type)
-
-                if self._nopaths and save_path:
-                    # 过滤不需要转移的路径
-                    nopath_skip = False
-                    for nopath in self._nopaths.split('\n'):
-                        if os.path.normpath(save_path).startswith(os.path.normpath(nopath)):
-                            logger.info(f"种子 {hash_str} 保存路径 {save_path} 不需要辅种，跳过 ...")
-                            nopath_skip = True
-                            break
-                    if nopath_skip:
-                        continue
-
-                # 获取种子标签
-                torrent_labels = self.__get_label(torrent=torrent, dl_type=service.type)
-                if torrent_labels and self._nolabels:
-                    is_skip = False
-                    for label in self._nolabels.split(','):
-                        if label in torrent_labels:
-                            logger.info(f"种子 {hash_str} 含有不辅种标签 {label}，跳过 ...")
-                            is_skip = True
-                            break
-                    if is_skip:
-                        continue
-                # 体积排除辅种
-                torrent_size = self.__get_torrent_size(torrent=torrent, dl_type=service.type) / 1024 / 1024 / 1024
-                if self._size and torrent_size < self._size:
-                    logger.info(f"种子 {hash_str} 大小:{torrent_size:.2f}GB，小于设定 {self._size}GB，跳过 ...")
-                    continue
-                category = self.__get_category(torrent=torrent, dl_type=service.type) if self._auto_category else None
-                hash_strs.append({
-                    "hash": hash_str,
-                    "save_path": save_path,
-                    "category": category or self._categoryafterseed
-                })
-            if hash_strs:
-                logger.info(f"总共需要辅种的种子数：{len(hash_strs)}")
-                # 分组处理，减少IYUU Api请求次数
-                chunk_size = 200
-                for i in range(0, len(hash_strs), chunk_size):
-                    # 切片操作
-                    chunk = hash_strs[i:i + chunk_size]
-                    # 处理分组
-                    self.__seed_torrents(hash_strs=chunk,
-                                         service=service)
-                # 触发校验检查
-                self.check_recheck()
-            else:
-                logger.info(f"没有需要辅种的种子")
+                # 切片操作
+                chunk = hash_strs[i:i + chunk_size]
+                # 处理分组
+                self.__seed_torrents(hash_strs=chunk)
+            # 触发校验检查
+            self.check_recheck()
+        else:
+            logger.info(f"没有需要辅种的种子")
 
         # 保存缓存
-        self.__update_config()
+        self.__save_caches()
         # 发送消息
         if self._notify:
             if self.success or self.fail:
@@ -779,82 +1069,253 @@ class IYUUAutoSeed(_PluginBase):
                          f"已存在：{self.exist}\n"
                          f"成功：{self.success}\n"
                          f"失败：{self.fail}\n"
-                         f"{self.cached} 条失败记录已加入缓存"
+                         f"{self.cached} 条失败记录已加入缓存\n"
+                         f"节省下载器查询：{self.rpc_saved} 次\n"
+                         f"IYUU查询缓存命中：{self.query_cached}/{self.query_total}"
                 )
-        logger.info("辅种任务执行完成")
+        # 释放索引
+        self._hash_index = {}
+        self._indexed_downloaders = set()
+        logger.info(f"辅种任务执行完成，通过种子索引节省下载器查询 {self.rpc_saved} 次，"
+                    f"IYUU查询缓存命中 {self.query_cached}/{self.query_total}"
+                    f"（{self.query_cached / self.query_total if self.query_total else 0:.1%}）")
+
+    def __scan_downloaders(self, service_infos: Dict[str, ServiceInfo]) -> List[dict]:
+        """
+        并发扫描所有下载器，建立跨下载器的种子Hash索引，同一种子在多个下载器中只查询一次
+        扫描失败的下载器不建立索引，查询种子是否存在时直接查询下载器
+        :param service_infos: 已检查可用的下载器服务信息
+        """
+        self._hash_index = {}
+        self._indexed_downloaders = set()
+        services = list(service_infos.values())
+        auto_service = self.auto_service_info
+        if auto_service and auto_service.name not in [service.name for service in services]:
+            services.append(auto_service)
+        results = []
+        with ThreadPoolExecutor(max_workers=len(services)) as executor:
+            futures = [executor.submit(self.__scan_downloader, service) for service in services]
+            for service, future in zip(services, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"扫描下载器 {service.name} 出错：{str(e)}，将逐个查询种子是否存在")
+                    results.append((service, None, []))
+        hash_strs = {}
+        for service, hashes, items in results:
+            if hashes is not None:
+                self._indexed_downloaders.add(service.name)
+                for hash_str in hashes:
+                    self._hash_index.setdefault(hash_str, service.name)
+            for item in items:
+                # 按下载器配置顺序，同一种子保留第一个下载器
+                if item.get("hash") in hash_strs:
+                    logger.debug(f"种子 {item.get('hash')} 同时存在于下载器 "
+                                 f"{hash_strs[item.get('hash')].get('service').name} 和 {service.name}，只查询一次")
+                    continue
+                hash_strs[item.get("hash")] = item
+        logger.info(f"下载器种子索引构建完成，种子数：{len(self._hash_index)}")
+        return list(hash_strs.values())
+
+    def __scan_downloader(self, service: ServiceInfo) -> Tuple[ServiceInfo, Optional[set], List[dict]]:
+        """
+        扫描单个下载器，在扫描线程中执行
+        :return: 下载器、全部种子Hash（获取失败为None）、需要辅种的种子
+        """
+        downloader = service.name
+        downloader_obj = service.instance
+        logger.info(f"开始扫描下载器 {downloader} ...")
+        torrents, error = downloader_obj.get_torrents()
+        if error:
+            logger.warn(f"下载器 {downloader} 获取种子列表失败，将逐个查询种子是否存在")
+            hashes = None
+        else:
+            hashes = {self.__get_hash(torrent=torrent, dl_type=service.type) for torrent in torrents or []}
+        hash_strs = []
+        # 主辅分离下载器不在辅种下载器中时只建立索引
+        if downloader not in self._downloaders:
+            return service, hashes, hash_strs
+        # 获取下载器中已完成的种子
+        torrents = downloader_obj.get_completed_torrents()
+        if torrents:
+            logger.info(f"下载器 {downloader} 已完成种子数：{len(torrents)}")
+        else:
+            logger.info(f"下载器 {downloader} 没有已完成种子")
+            return service, hashes, hash_strs
+        for torrent in torrents:
+            if self._event.is_set():
+                break
+            # 获取种子hash
+            hash_str = self.__get_hash(torrent=torrent, dl_type=service.type)
+            if hash_str in self._error_caches or hash_str in self._permanent_error_caches:
+                logger.info(f"种子 {hash_str} 辅种失败且已缓存，跳过 ...")
+                continue
+            save_path = self.__get_save_path(torrent=torrent, dl_type=service.type)
+
+            # 过滤不需要辅种的路径
+            nopath = self._path_matcher.match(save_path)
+            if nopath:
+                logger.info(f"种子 {hash_str} 保存路径 {save_path} 匹配不辅种目录 {nopath}，跳过 ...")
+                continue
+
+            # 获取种子标签
+            if self._label_matcher:
+                label = self._label_matcher.match(self.__get_label(torrent=torrent, dl_type=service.type))
+                if label:
+                    logger.info(f"种子 {hash_str} 含有不辅种标签 {label}，跳过 ...")
+                    continue
+            # 体积排除辅种
+            torrent_size = self.__get_torrent_size(torrent=torrent, dl_type=service.type) / 1024 / 1024 / 1024
+            if self._size and torrent_size < self._size:
+                logger.info(f"种子 {hash_str} 大小:{torrent_size:.2f}GB，小于设定 {self._size}GB，跳过 ...")
+                continue
+            category = self.__get_category(torrent=torrent, dl_type=service.type) if self._auto_category else None
+            hash_strs.append({
+                "hash": hash_str,
+                "service": service,
+                "save_path": save_path,
+                "category": category or self._categoryafterseed
+            })
+        logger.info(f"下载器 {downloader} 扫描完成，需要辅种的种子数：{len(hash_strs)}")
+        return service, hashes, hash_strs
+
+    def __is_torrent_exists(self, service: ServiceInfo, info_hash: str) -> bool:
+        """
+        查询种子是否已在任一下载器中，优先使用索引，目标下载器索引不可用时查询下载器
+        """
+        if info_hash in self._hash_index:
+            self.rpc_saved += 1
+            return True
+        if service.name in self._indexed_downloaders:
+            self.rpc_saved += 1
+            return False
+        torrent_info, _ = service.instance.get_torrents(ids=[info_hash])
+        return True if torrent_info else False
 
     def check_recheck(self):
         """
-        定时检查下载器中种子是否校验完成，校验完成且完整的自动开始辅种
+        定时检查下载器中种子是否校验完成，校验完成且完整的自动开始辅种，并分批发起等待中的校验
         """
-        if not self._recheck_torrents:
+        if not self._recheck_torrents and not self._recheck_queue:
             return
         if self._is_recheck_running:
             return
         self._is_recheck_running = True
-        if self.auto_service_info:
-            # 检查指定下载器
-            self.check_recheck_service(self.auto_service_info)
+        try:
+            if self.auto_service_info:
+                # 检查指定下载器
+                self.check_recheck_service(self.auto_service_info)
+                return
+            if not self.service_infos:
+                return
+            for service in self.service_infos.values():
+                # 需要检查的种子
+                self.check_recheck_service(service)
+        finally:
             self._is_recheck_running = False
-            return
-        if not self.service_infos:
-            return
-        for service in self.service_infos.values():
-            # 需要检查的种子
-            self.check_recheck_service(service)
-        self._is_recheck_running = False
 
     def check_recheck_service(self, service: ServiceInfo):
         """
         检查指定下载器中种子是否校验完成，校验完成且完整的自动开始辅种
+        按同时校验的数量和大小限制，将等待中的种子分批发起校验
         """
-        # 需要检查的种子
         downloader = service.name
         downloader_obj = service.instance
-        recheck_torrents = self._recheck_torrents.get(downloader) or []
-        if not recheck_torrents:
+        with self._recheck_lock:
+            queued = dict(self._recheck_queue.get(downloader) or {})
+            verifying = dict(self._recheck_torrents.get(downloader) or {})
+        if not queued and not verifying:
             return
-        logger.info(f"开始检查下载器 {downloader} 的校验任务 ...")
-        # 获取下载器中的种子状态
-        torrents, _ = downloader_obj.get_torrents(ids=recheck_torrents)
-        if torrents:
-            can_seeding_torrents = []
-            for torrent in torrents:
-                # 获取种子hash
-                hash_str = self.__get_hash(torrent=torrent, dl_type=service.type)
-                if self.__can_seeding(torrent=torrent, dl_type=service.type):
-                    can_seeding_torrents.append(hash_str)
-            if can_seeding_torrents:
-                logger.info(f"共 {len(can_seeding_torrents)} 个任务校验完成，开始辅种 ...")
-                # 开始任务
-                downloader_obj.start_torrents(ids=can_seeding_torrents)
-                # 去除已经处理过的种子
-                self._recheck_torrents[downloader] = list(
-                    set(recheck_torrents).difference(set(can_seeding_torrents)))
-        elif torrents is None:
+        logger.info(f"开始检查下载器 {downloader} 的校验任务，等待校验：{len(queued)}，校验中：{len(verifying)} ...")
+        # 一次获取下载器中所有相关种子的状态
+        torrents, error = downloader_obj.get_torrents(ids=list(queued) + list(verifying))
+        if error or torrents is None:
             logger.info(f"下载器 {downloader} 查询校验任务失败，将在下次继续查询 ...")
             return
-        else:
-            logger.info(f"下载器 {downloader} 中没有需要检查的校验任务，清空待处理列表 ...")
-            self._recheck_torrents[downloader] = []
-
-    def __seed_torrents(self, hash_strs: list, service: ServiceInfo):
+        torrent_map = {self.__get_hash(torrent=torrent, dl_type=service.type): torrent for torrent in torrents}
+        now = time.time()
+        # 校验完成可开始的种子
+        can_seeding_torrents = []
+        # 不再需要跟踪的种子
+        finished_torrents = []
+        verifying_size = 0
+        # 超过等待时间仍不完整的种子，继续跟踪直到完整或被移除
+        stalled_torrents = []
+        verifying_count = 0
+        for hash_str, recheck_time in verifying.items():
+            torrent = torrent_map.get(hash_str)
+            if not torrent:
+                finished_torrents.append(hash_str)
+                continue
+            state = self.__get_recheck_state(torrent=torrent, dl_type=service.type)
+            if state == "seeding":
+                can_seeding_torrents.append(hash_str)
+            elif state == "checking" or (state == "incomplete" and now - recheck_time < self._recheck_grace):
+                verifying_count += 1
+                verifying_size += self.__get_torrent_size(torrent=torrent, dl_type=service.type) or 0
+            elif state == "incomplete":
+                stalled_torrents.append(hash_str)
+            else:
+                finished_torrents.append(hash_str)
+        with self._recheck_lock:
+            stalled = self._recheck_stalled.setdefault(downloader, set())
+            for hash_str in stalled_torrents:
+                if hash_str not in stalled:
+                    logger.warn(f"{hash_str} 校验后数据不完整，请手动检查，完整后将自动开始 ...")
+                    stalled.add(hash_str)
+        if can_seeding_torrents:
+            logger.info(f"共 {len(can_seeding_torrents)} 个任务校验完成，开始辅种 ...")
+            # 开始任务
+            downloader_obj.start_torrents(ids=can_seeding_torrents)
+        # 分批发起校验
+        max_size = self._recheck_size * 1024 ** 3
+        recheck_torrents = []
+        removed_torrents = []
+        for hash_str in queued:
+            torrent = torrent_map.get(hash_str)
+            if not torrent:
+                removed_torrents.append(hash_str)
+                continue
+            if verifying_count >= self._recheck_count:
+                break
+            torrent_size = self.__get_torrent_size(torrent=torrent, dl_type=service.type) or 0
+            # 至少保证有一个种子在校验
+            if max_size and verifying_count and verifying_size + torrent_size > max_size:
+                break
+            recheck_torrents.append(hash_str)
+            verifying_count += 1
+            verifying_size += torrent_size
+        if recheck_torrents:
+            logger.info(f"下载器 {downloader} 发起校验：{len(recheck_torrents)} 个，"
+                        f"校验中种子大小：{StringUtils.str_filesize(verifying_size)}")
+            downloader_obj.recheck_torrents(ids=recheck_torrents)
+        with self._recheck_lock:
+            verifying_torrents = self._recheck_torrents.setdefault(downloader, {})
+            for hash_str in can_seeding_torrents + finished_torrents:
+                verifying_torrents.pop(hash_str, None)
+                stalled.discard(hash_str)
+            for hash_str in recheck_torrents:
+                verifying_torrents[hash_str] = now
+            queued_torrents = self._recheck_queue.setdefault(downloader, {})
+            for hash_str in recheck_torrents + removed_torrents:
+                queued_torrents.pop(hash_str, None)
+            self._recheck_started[downloader] = (self._recheck_started.get(downloader) or 0) \
+                + len(can_seeding_torrents)
+        self.__save_recheck_tasks()
+
+    def __seed_torrents(self, hash_strs: list):
         """
-        执行一批种子的辅种
+        执行一批种子的辅种，种子可能来自不同下载器
         """
         if not hash_strs:
             return
-        logger.info(f"下载器 {service.name} 开始查询辅种，数量：{len(hash_strs)} ...")
+        logger.info(f"开始查询辅种，数量：{len(hash_strs)} ...")
         # 下载器中的Hashs
         hashs = [item.get("hash") for item in hash_strs]
-        # 每个Hash的保存目录
-        save_paths = {}
-        save_category = {}
-        for item in hash_strs:
-            save_paths[item.get("hash")] = item.get("save_path")
-            save_category[item.get("hash")] = item.get("category")
+        # 每个Hash的来源
+        hash_items = {item.get("hash"): item for item in hash_strs}
         # 查询可辅种数据
-        seed_list, msg = self.iyuu_helper.get_seed_info(hashs)
+        seed_list, msg = self.__get_seed_info(hashs)
         if not isinstance(seed_list, dict):
             # 判断辅种异常是否是由于Token未认证导致的，由于没有解决接口，只能从返回值来判断
             if self._token and msg == '请求缺少token':
@@ -864,17 +1325,22 @@ class IYUUAutoSeed(_PluginBase):
             return
         else:
             logger.info(f"IYUU返回可辅种数：{len(seed_list)}")
-        # 遍历
+        # 添加任务 如果配置了主辅分离使用辅种下载器，否则添加到源种子所在的下载器
+        auto_service = self.auto_service_info if self._auto_downloader else None
+        if self._auto_downloader and not auto_service:
+            logger.warn(f"主辅分离下载器 {self._auto_downloader} 不可用，跳过辅种")
+            return
+        # 遍历，生成待下载的辅种任务
+        tasks = []
+        task_hashes = set()
         for current_hash, seed_info in seed_list.items():
-            if not seed_info:
+            if not seed_info or current_hash not in hash_items:
                 continue
+            source = hash_items[current_hash]
             seed_torrents = seed_info.get("torrent")
             if not isinstance(seed_torrents, list):
                 seed_torrents = [seed_torrents]
 
-            # 本次辅种成功的种子
-            success_torrents = []
-
             for seed in seed_torrents:
                 if not seed:
                     continue
@@ -891,82 +1357,45 @@ class IYUUAutoSeed(_PluginBase):
                 if seed.get("info_hash") in self._error_caches or seed.get("info_hash") in self._permanent_error_caches:
                     logger.info(f"种子 {seed.get('info_hash')} 辅种失败且已缓存，跳过 ...")
                     continue
-                # 添加任务 如果配置了主辅分离使用辅种下载器
-                if self._auto_downloader:
-                    success = self.__download_torrent(seed=seed,
-                                                      service=self.auto_service_info,
-                                                      save_path=save_paths.get(current_hash),
-                                                      save_category=save_category.get(current_hash))
-                else:
-                    success = self.__download_torrent(seed=seed,
-                                                      service=service,
-                                                      save_path=save_paths.get(current_hash),
-                                                      save_category=save_category.get(current_hash))
-                if success:
-                    success_torrents.append(seed.get("info_hash"))
-
-            # 辅种成功的去重放入历史
-            if len(success_torrents) > 0:
-                self.__save_history(current_hash=current_hash,
-                                    downloader=service.name,
-                                    success_torrents=success_torrents)
-
-        logger.info(f"下载器 {service.name} 辅种完成")
-
-    def __save_history(self, current_hash: str, downloader: str, success_torrents: []):
-        """
-        [
-            {
-                "downloader":"2",
-                "torrents":[
-                    "248103a801762a66c201f39df7ea325f8eda521b",
-                    "bd13835c16a5865b01490962a90b3ec48889c1f0"
-                ]
-            },
-            {
-                "downloader":"3",
-                "torrents":[
-                    "248103a801762a66c201f39df7ea325f8eda521b",
-                    "bd13835c16a5865b01490962a90b3ec48889c1f0"
-                ]
-            }
-        ]
-        """
-        try:
-            # 查询当前Hash的辅种历史
-            seed_history = self.get_data(key=current_hash) or []
-
-            new_history = True
-            if len(seed_history) > 0:
-                for history in seed_history:
-                    if not history:
-                        continue
-                    if not isinstance(history, dict):
-                        continue
-                    if not history.get("downloader"):
-                        continue
-                    # 如果本次辅种下载器之前有过记录则继续添加
-                    if str(history.get("downloader")) == downloader:
-                        history_torrents = history.get("torrents") or []
-                        history["torrents"] = list(set(history_torrents + success_torrents))
-                        new_history = False
-                        break
-
-            # 本次辅种下载器之前没有成功记录则新增
-            if new_history:
-                seed_history.append({
-                    "downloader": downloader,
-                    "torrents": list(set(success_torrents))
+                if seed.get("info_hash") in task_hashes:
+                    logger.info(f"{seed.get('info_hash')} 已在本批次辅种任务中，跳过 ...")
+                    continue
+                task = self.__prepare_seed(seed=seed,
+                                           service=auto_service or source.get("service"),
+                                           save_path=source.get("save_path"),
+                                           save_category=source.get("category"))
+                if not task:
+                    continue
+                task["current_hash"] = current_hash
+                task_hashes.add(seed.get("info_hash"))
+                tasks.append(task)
+
+        # 并发下载种子文件，并逐个添加到下载器，本次辅种成功的种子
+        success_records = []
+        for result in self.__fetch_torrents(tasks):
+            if self._event.is_set():
+                logger.info(f"辅种服务停止")
+                break
+            if self.__add_seed_torrent(result):
+                task = result.get("task")
+                success_records.append({
+                    "hash": task.get("current_hash"),
+                    "downloader": hash_items[task.get("current_hash")].get("service").name,
+                    "target_hash": task.get("seed").get("info_hash"),
+                    "site": task.get("site_info").get("name")
                 })
 
-            # 保存历史
-            self.save_data(key=current_hash,
-                           value=seed_history)
-        except Exception as e:
-            print(str(e))
+        # 辅种成功的批量放入历史
+        if success_records and self._seed_history:
+            try:
+                self._seed_history.add(success_records)
+            except Exception as e:
+                logger.error(f"保存辅种历史失败：{str(e)}")
+
+        logger.info("本批次辅种完成")
 
     def __download(self, service: ServiceInfo, content: bytes,
-                   save_path: str, save_category: str, site_name: str) -> Optional[str]:
+                   save_path: str, save_category: str, site_name: str, info_hash: str) -> Optional[str]:
 
         torrent_tags = self._labelsafterseed.split(',')
 
@@ -978,10 +1407,14 @@ class IYUUAutoSeed(_PluginBase):
         添加下载任务
         """
         if service.type == "qbittorrent":
-            # 生成随机Tag
-            tag = StringUtils.generate_random_str(10)
-
-            torrent_tags.append(tag)
+            # 从种子内容计算Hash，与IYUU返回的一致时直接使用，否则通过随机Tag查询
+            torrent_hash = self.__get_info_hash(content)
+            tag = None
+            if not torrent_hash or torrent_hash != info_hash:
+                logger.debug(f"种子Hash计算结果 {torrent_hash} 与 {info_hash} 不一致，通过标签获取种子Hash")
+                # 生成随机Tag
+                tag = StringUtils.generate_random_str(10)
+                torrent_tags.append(tag)
 
             state = service.instance.add_torrent(content=content,
                                                  download_dir=save_path,
@@ -991,7 +1424,7 @@ class IYUUAutoSeed(_PluginBase):
                                                  is_skip_checking=self._skipverify)
             if not state:
                 return None
-            else:
+            if tag:
                 # 获取种子Hash
                 torrent_hash = service.instance.get_torrent_id_by_tag(tags=tag)
                 if not torrent_hash:
@@ -1012,106 +1445,222 @@ class IYUUAutoSeed(_PluginBase):
         logger.error(f"不支持的下载器：{service.type}")
         return None
 
-    def __download_torrent(self, seed: dict, service: ServiceInfo, save_path: str, save_category: str):
+    def __get_seed_info(self, hashs: List[str]) -> Tuple[Optional[dict], str]:
         """
-        下载种子
-        torrent: {
-                    "sid": 3,
-                    "torrent_id": 377467,
-                    "info_hash": "a444850638e7a6f6220e2efdde94099c53358159"
-                }
+        查询可辅种数据，缓存有效期内的种子直接使用缓存结果，只向IYUU查询新增或过期的种子
         """
+        seed_list = {}
+        query_hashs = []
+        for hash_str in hashs:
+            torrents = self._seed_info_caches.get(hash_str) if self._query_cache_hours else None
+            if torrents is None:
+                query_hashs.append(hash_str)
+                continue
+            if torrents:
+                seed_list[hash_str] = {"torrent": torrents}
+        self.query_total += len(hashs)
+        self.query_cached += len(hashs) - len(query_hashs)
+        if not query_hashs:
+            logger.info(f"辅种查询全部命中缓存，数量：{len(hashs)}")
+            return seed_list, ""
+        logger.info(f"辅种查询命中缓存：{len(hashs) - len(query_hashs)}，需要查询IYUU：{len(query_hashs)}")
+        result, msg = self.iyuu_helper.get_seed_info(query_hashs)
+        if msg:
+            # 查询失败时仍可使用已缓存的结果
+            if not seed_list:
+                return None, msg
+            logger.warn(f"IYUU查询失败，仅使用缓存结果辅种：{msg}")
+            return seed_list, ""
+        # 没有可辅种数据时IYUU可能返回空列表
+        if not isinstance(result, dict):
+            result = {}
+        for hash_str in query_hashs:
+            seed_info = result.get(hash_str)
+            torrents = seed_info.get("torrent") if isinstance(seed_info, dict) else None
+            if torrents and not isinstance(torrents, list):
+                torrents = [torrents]
+            if self._query_cache_hours:
+                self._seed_info_caches.put(hash_str, torrents or [])
+            if torrents:
+                seed_list[hash_str] = {"torrent": torrents}
+        return seed_list, ""
 
-        def __is_special_site(url):
-            """
-            判断是否为特殊站点（是否需要添加https）
-            """
-            if "hdsky.me" in url:
-                return False
-            return True
-
+    def __prepare_seed(self, seed: dict, service: ServiceInfo,
+                       save_path: str, save_category: str) -> Optional[dict]:
+        """
+        检查辅种站点及下载器，生成种子下载任务
+        seed: {
+                "sid": 3,
+                "torrent_id": 377467,
+                "info_hash": "a444850638e7a6f6220e2efdde94099c53358159"
+            }
+        """
         self.total += 1
         # 获取种子站点及下载地址模板
         site_url, download_page = self.iyuu_helper.get_torrent_url(seed.get("sid"))
         if not site_url or not download_page:
             # 加入缓存
-            self._error_caches.append(seed.get("info_hash"))
+            self._error_caches.add(seed.get("info_hash"))
             self.fail += 1
             self.cached += 1
-            return False
+            return None
         # 查询站点
         site_domain = StringUtils.get_url_domain(site_url)
         # 站点信息
-        sites_helper = SitesHelper()
-        site_info = sites_helper.get_indexer(site_domain)
+        site_info = SitesHelper().get_indexer(site_domain)
         if not site_info or not site_info.get('url'):
             logger.debug(f"没有维护种子对应的站点：{site_url}")
-            return False
+            return None
         if self._sites and site_info.get('id') not in self._sites:
             logger.info("当前站点不在选择的辅种站点范围，跳过 ...")
-            return False
+            return None
         self.realtotal += 1
         # 查询hash值是否已经在下载器中
-        downloader_obj = service.instance
-        torrent_info, _ = downloader_obj.get_torrents(ids=[seed.get("info_hash")])
-        if torrent_info:
+        if self.__is_torrent_exists(service=service, info_hash=seed.get("info_hash")):
             logger.info(f"{seed.get('info_hash')} 已在下载器中，跳过 ...")
             self.exist += 1
-            return False
-        # 站点流控
-        check, checkmsg = sites_helper.check(site_domain)
-        if check:
-            logger.warn(checkmsg)
+            return None
+        return {
+            "seed": seed,
+            "service": service,
+            "save_path": save_path,
+            "save_category": save_category,
+            "site_domain": site_domain,
+            "site_info": site_info,
+            "download_page": download_page
+        }
+
+    def __fetch_torrents(self, tasks: List[dict]) -> Iterator[dict]:
+        """
+        多线程下载种子文件，限制单个站点的并发数，按完成顺序返回下载结果
+        """
+        if not tasks:
+            return
+        site_tasks: Dict[str, List[dict]] = {}
+        for task in tasks:
+            site_tasks.setdefault(task.get("site_domain"), []).append(task)
+        site_locks = {domain: Semaphore(self._site_workers) for domain in site_tasks}
+        # 按站点交错排列，避免线程集中等待同一站点
+        ordered_tasks = [task for group in zip_longest(*site_tasks.values()) for task in group if task]
+        logger.info(f"开始下载种子文件，数量：{len(ordered_tasks)}，站点数：{len(site_tasks)}，"
+                    f"线程数：{self._download_workers}")
+        with ThreadPoolExecutor(max_workers=self._download_workers) as executor:
+            futures = [executor.submit(self.__fetch_torrent, task, site_locks[task.get("site_domain")])
+                       for task in ordered_tasks]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def __fetch_torrent(self, task: dict, site_lock: Semaphore) -> dict:
+        """
+        下载单个种子文件，在下载线程中执行，只返回结果不修改插件状态
+        """
+
+        def __is_special_site(url):
+            """
+            判断是否为特殊站点（是否需要添加https）
+            """
+            if "hdsky.me" in url:
+                return False
+            return True
+
+        result = {
+            "task": task,
+            "flow_control": False,
+            "torrent_url": None,
+            "content": None,
+            "error_msg": None
+        }
+        with site_lock:
+            if self._event.is_set():
+                result["error_msg"] = "辅种服务停止"
+                return result
+            try:
+                site_info = task.get("site_info")
+                # 站点流控
+                check, checkmsg = SitesHelper().check(task.get("site_domain"))
+                if check:
+                    result["flow_control"] = True
+                    result["error_msg"] = checkmsg
+                    return result
+                # 下载种子
+                torrent_url = self.__get_download_url(seed=task.get("seed"),
+                                                      site=site_info,
+                                                      base_url=task.get("download_page"))
+                if not torrent_url:
+                    return result
+                # 强制使用Https
+                if __is_special_site(torrent_url):
+                    if "?" in torrent_url:
+                        torrent_url += "&https=1"
+                    else:
+                        torrent_url += "?https=1"
+                result["torrent_url"] = torrent_url
+                # 下载种子文件
+                _, content, _, _, error_msg = TorrentHelper().download_torrent(
+                    url=torrent_url,
+                    cookie=site_info.get("cookie"),
+                    ua=site_info.get("ua") or settings.USER_AGENT,
+                    proxy=site_info.get("proxy"))
+                result["content"] = content
+                result["error_msg"] = error_msg
+            except Exception as e:
+                logger.error(f"下载种子文件出错：{str(e)}")
+                result["error_msg"] = str(e)
+        return result
+
+    def __add_seed_torrent(self, result: dict) -> bool:
+        """
+        处理种子文件下载结果，添加辅种任务到下载器
+        """
+        task = result.get("task")
+        seed = task.get("seed")
+        service = task.get("service")
+        site_info = task.get("site_info")
+        torrent_url = result.get("torrent_url")
+        content = result.get("content")
+        if result.get("flow_control"):
+            logger.warn(result.get("error_msg"))
             self.fail += 1
             return False
-        # 下载种子
-        torrent_url = self.__get_download_url(seed=seed,
-                                              site=site_info,
-                                              base_url=download_page)
         if not torrent_url:
+            if self._event.is_set():
+                return False
             # 加入失败缓存
-            self._error_caches.append(seed.get("info_hash"))
+            self._error_caches.add(seed.get("info_hash"))
             self.fail += 1
             self.cached += 1
             return False
-        # 强制使用Https
-        if __is_special_site(torrent_url):
-            if "?" in torrent_url:
-                torrent_url += "&https=1"
-            else:
-                torrent_url += "?https=1"
-        # 下载种子文件
-        _, content, _, _, error_msg = TorrentHelper().download_torrent(
-            url=torrent_url,
-            cookie=site_info.get("cookie"),
-            ua=site_info.get("ua") or settings.USER_AGENT,
-            proxy=site_info.get("proxy"))
         if not content:
             # 下载失败
             self.fail += 1
             # 加入失败缓存
+            error_msg = result.get("error_msg")
             if error_msg and ('无法打开链接' in error_msg or '触发站点流控' in error_msg):
-                self._error_caches.append(seed.get("info_hash"))
+                self._error_caches.add(seed.get("info_hash"))
             else:
                 # 种子不存在的情况
-                self._permanent_error_caches.append(seed.get("info_hash"))
+                self._permanent_error_caches.add(seed.get("info_hash"))
             logger.error(f"下载种子文件失败：{torrent_url}")
             return False
         # 添加下载，辅种任务默认暂停
         logger.info(f"添加下载任务：{torrent_url} ...")
         download_id = self.__download(service=service,
                                       content=content,
-                                      save_path=save_path,
-                                      save_category=save_category,
-                                      site_name=site_info.get("name"))
+                                      save_path=task.get("save_path"),
+                                      save_category=task.get("save_category"),
+                                      site_name=site_info.get("name"),
+                                      info_hash=seed.get("info_hash"))
         if not download_id:
             # 下载失败
             self.fail += 1
             # 加入失败缓存
-            self._error_caches.append(seed.get("info_hash"))
+            self._error_caches.add(seed.get("info_hash"))
             return False
         else:
             self.success += 1
+            # 更新种子索引
+            self._hash_index[download_id] = service.name
+            self._hash_index[seed.get("info_hash")] = service.name
             if service.type == "qbittorrent":
                 if self._skipverify:
                     if self._auto_start:
@@ -1121,23 +1670,82 @@ class IYUUAutoSeed(_PluginBase):
                         # 跳过校验
                         logger.info(f"{download_id} 跳过校验，请自行检查手动开始任务...")
                 else:
-                    # 开始校验种子
-                    downloader_obj.recheck_torrents(ids=[download_id])
-                    self.__add_recheck_torrents(service, download_id)
+                    # 等待分批校验种子
+                    self.__add_recheck_torrents(service, download_id, recheck=True)
             else:
                 self.__add_recheck_torrents(service, download_id)
             # 下载成功
             logger.info(f"成功添加辅种下载，站点：{site_info.get('name')}，种子链接：{torrent_url}")
             # 成功也加入缓存，有一些改了路径校验不通过的，手动删除后，下一次又会辅上
-            self._success_caches.append(seed.get("info_hash"))
+            self._success_caches.add(seed.get("info_hash"))
             return True
 
-    def __add_recheck_torrents(self, service: ServiceInfo, download_id: str):
-        # 追加校验任务
+    def __add_recheck_torrents(self, service: ServiceInfo, download_id: str, recheck: bool = False):
+        """
+        追加校验任务
+        :param recheck: 是否需要由插件发起校验，否则只检查校验结果
+        """
         logger.info(f"添加校验检查任务：{download_id} ...")
-        if not self._recheck_torrents.get(service.name):
-            self._recheck_torrents[service.name] = []
-        self._recheck_torrents[service.name].append(download_id)
+        with self._recheck_lock:
+            if recheck:
+                self._recheck_queue.setdefault(service.name, {})[download_id] = time.time()
+            else:
+                self._recheck_torrents.setdefault(service.name, {})[download_id] = time.time()
+        self.__save_recheck_tasks()
+
+    def __load_recheck_tasks(self):
+        """
+        加载保存的校验任务，避免重启后暂停的辅种种子无人校验及开始
+        """
+        data = self.get_data("recheck_tasks") or {}
+        with self._recheck_lock:
+            self._recheck_queue = {downloader: dict(torrents)
+                                   for downloader, torrents in (data.get("queue") or {}).items()}
+            self._recheck_torrents = {downloader: dict(torrents)
+                                      for downloader, torrents in (data.get("torrents") or {}).items()}
+            self._recheck_stalled = {downloader: set(torrents)
+                                     for downloader, torrents in (data.get("stalled") or {}).items()}
+
+    def __save_recheck_tasks(self):
+        """
+        保存等待校验及校验中的种子
+        """
+        with self._recheck_lock:
+            data = {
+                "queue": {downloader: dict(torrents) for downloader, torrents in self._recheck_queue.items()
+                          if torrents},
+                "torrents": {downloader: dict(torrents) for downloader, torrents in self._recheck_torrents.items()
+                             if torrents},
+                "stalled": {downloader: list(torrents) for downloader, torrents in self._recheck_stalled.items()
+                            if torrents}
+            }
+        self.save_data("recheck_tasks", data)
+
+    @staticmethod
+    def __get_info_hash(content: bytes) -> Optional[str]:
+        """
+        从种子内容计算v1 info_hash
+        """
+        try:
+            torrent = bdecode(content)
+            info = torrent.get("info") if isinstance(torrent, dict) else None
+            if not info:
+                return None
+            return hashlib.sha1(bencode(info)).hexdigest()
+        except Exception as e:
+            logger.debug(f"解析种子内容失败：{str(e)}")
+            return None
+
+    @staticmethod
+    def __to_positive_int(value: Any, default: int) -> int:
+        """
+        转换为正整数，无效时返回默认值
+        """
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return default
+        return value if value > 0 else default
 
     @staticmethod
     def __get_hash(torrent: Any, dl_type: str):
@@ -1174,16 +1782,29 @@ class IYUUAutoSeed(_PluginBase):
             return []
 
     @staticmethod
-    def __can_seeding(torrent: Any, dl_type: str):
+    def __get_recheck_state(torrent: Any, dl_type: str) -> str:
         """
-        判断种子是否可以做种并处于暂停状态
+        获取种子校验状态
+        :return: checking 校验中，seeding 完整并处于暂停状态可以做种，incomplete 暂停且不完整，other 其它
         """
         try:
-            return torrent.get("state") in ["pausedUP", "stoppedUP"] if dl_type == "qbittorrent" \
-                else (torrent.status.stopped and torrent.percent_done == 1)
+            if dl_type == "qbittorrent":
+                state = torrent.get("state")
+                if state in ["checkingUP", "checkingDL", "checkingResumeData", "queuedForChecking"]:
+                    return "checking"
+                if state in ["pausedUP", "stoppedUP"]:
+                    return "seeding"
+                if state in ["pausedDL", "stoppedDL"]:
+                    return "incomplete"
+                return "other"
+            if torrent.status.checking or torrent.status.check_pending:
+                return "checking"
+            if torrent.status.stopped:
+                return "seeding" if torrent.percent_done == 1 else "incomplete"
+            return "other"
         except Exception as e:
-            print(str(e))
-            return False
+            logger.error(f"获取种子校验状态失败：{str(e)}")
+            return "other"
 
     @staticmethod
     def __get_save_path(torrent: Any, dl_type: str):
@@ -1379,6 +2000,8 @@ class IYUUAutoSeed(_PluginBase):
                     self._scheduler.shutdown()
                     self._event.clear()
                 self._scheduler = None
+            if self.iyuu_helper:
+                self.iyuu_helper.close()
         except Exception as e:
             print(str(e))
 
@@ -0,0 +1,141 @@
+import fnmatch
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from app.log import logger
+
+
+def _compile_pattern(rule: str) -> Optional[Pattern]:
+    """
+    编译通配符或正则规则，re:开头为正则，glob:开头为通配符，其它按普通规则原样匹配返回None
+    """
+    try:
+        if rule.startswith("re:"):
+            return re.compile(rule[3:])
+        if rule.startswith("glob:"):
+            return re.compile(fnmatch.translate(rule[5:]))
+    except re.error as e:
+        logger.error(f"不辅种规则 {rule} 格式错误：{str(e)}")
+        return re.compile(r"(?!)")
+    return None
+
+
+class PathMatcher(object):
+    """
+    不辅种目录匹配，普通目录构建为按目录层级的前缀树，支持通配符（glob:开头）及正则（re:开头）
+    """
+
+    def __init__(self, rules: Optional[str] = None):
+        """
+        :param rules: 不辅种目录，每行一个
+        """
+        # 前缀树，每层为{目录名: 子节点}，键None记录命中的规则
+        self._trie: Dict = {}
+        self._patterns: List[Tuple[str, Pattern]] = []
+        # 已匹配过的路径
+        self._cache: Dict[str, Optional[str]] = {}
+        for rule in (rules or "").splitlines():
+            rule = rule.strip()
+            if not rule:
+                continue
+            if rule.startswith("glob:"):
+                rule = "glob:" + "/".join(self.__split(rule[5:]))
+            elif not rule.startswith("re:"):
+                rule = "/".join(self.__split(rule))
+            pattern = _compile_pattern(rule)
+            if pattern:
+                self._patterns.append((rule, pattern))
+                continue
+            node = self._trie
+            for part in self.__split(rule):
+                node = node.setdefault(part, {})
+            node.setdefault(None, rule)
+
+    def __bool__(self) -> bool:
+        return bool(self._trie or self._patterns)
+
+    @staticmethod
+    def __split(path: str) -> List[str]:
+        """
+        规范化路径并拆分为目录层级
+        """
+        return os.path.normpath(path).replace("\\", "/").rstrip("/").split("/")
+
+    def __match_patterns(self, parts: List[str]) -> Optional[str]:
+        """
+        匹配通配符及正则规则，通配符匹配路径本身及其上级目录，正则在完整路径中查找
+        """
+        full_path = "/".join(parts)
+        prefixes = ["/".join(parts[:depth]) for depth in range(1, len(parts) + 1)]
+        for rule, pattern in self._patterns:
+            if rule.startswith("re:"):
+                if pattern.search(full_path):
+                    return rule
+            elif any(pattern.match(prefix) for prefix in prefixes):
+                return rule
+        return None
+
+    def match(self, path: str) -> Optional[str]:
+        """
+        匹配路径，返回命中的规则，未命中返回None
+        """
+        if not path or not self:
+            return None
+        if path in self._cache:
+            return self._cache[path]
+        parts = self.__split(path)
+        matched = None
+        node = self._trie
+        for part in parts:
+            node = node.get(part)
+            if node is None:
+                break
+            if None in node:
+                matched = node[None]
+                break
+        if not matched and self._patterns:
+            matched = self.__match_patterns(parts)
+        self._cache[path] = matched
+        return matched
+
+
+class LabelMatcher(object):
+    """
+    不辅种标签匹配，普通标签使用集合查找，支持通配符（glob:开头）及正则（re:开头）
+    """
+
+    def __init__(self, rules: Optional[str] = None):
+        """
+        :param rules: 不辅种标签，使用,分隔
+        """
+        labels = set()
+        self._patterns: List[Tuple[str, Pattern]] = []
+        for rule in (rules or "").split(","):
+            rule = rule.strip()
+            if not rule:
+                continue
+            pattern = _compile_pattern(rule)
+            if pattern:
+                self._patterns.append((rule, pattern))
+            else:
+                labels.add(rule)
+        self._labels = frozenset(labels)
+
+    def __bool__(self) -> bool:
+        return bool(self._labels or self._patterns)
+
+    def match(self, labels: Iterable[str]) -> Optional[str]:
+        """
+        匹配种子标签，返回命中的规则，未命中返回None
+        """
+        if not labels or not self:
+            return None
+        for label in labels:
+            if label in self._labels:
+                return label
+        for rule, pattern in self._patterns:
+            for label in labels:
+                if (pattern.search(label) if rule.startswith("re:") else pattern.match(label)):
+                    return rule
+        return None
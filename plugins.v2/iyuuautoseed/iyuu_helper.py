@@ -1,7 +1,12 @@
 import hashlib
 import json
 import time
-from typing import Tuple, Optional
+from threading import Lock
+from typing import Any, Callable, Dict, Tuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from app.utils.http import RequestUtils
 
@@ -15,39 +20,100 @@ class IyuuHelper(object):
     _sites = {}
     _token = None
     _sid_sha1 = None
+    # 请求超时时间（秒）
+    _timeout = 30
+    # 站点列表缓存时间（秒）
+    _sites_cache_ttl = 24 * 3600
+    # 站点列表缓存键
+    _sites_cache_key = "iyuu_sites"
 
-    def __init__(self, token: str):
+    def __init__(self, token: str,
+                 loader: Optional[Callable[[str], Any]] = None,
+                 saver: Optional[Callable[[str, Any], None]] = None):
+        """
+        :param token: IYUU Token
+        :param loader: 按键读取持久化数据，用于缓存站点列表
+        :param saver: 按键保存持久化数据
+        """
         self._token = token
+        self._loader = loader
+        self._saver = saver
+        self._session = None
+        self._req = None
+        # 接口统计，{接口: {"count": 请求数, "errors": 失败数, "time": 总耗时, "max_time": 最大耗时}}
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self._metrics_lock = Lock()
         if self._token:
             self.init_config()
 
     def init_config(self):
-        pass
+        """
+        初始化长连接会话，超时、连接错误及5xx状态自动按指数退避重试
+        """
+        retries = Retry(total=3,
+                        backoff_factor=1,
+                        status_forcelist=[500, 502, 503, 504],
+                        allowed_methods=None,
+                        raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._req = RequestUtils(accept_type="application/json",
+                                 headers={'token': self._token},
+                                 session=self._session,
+                                 timeout=self._timeout)
+
+    def close(self):
+        """
+        关闭会话
+        """
+        if self._session:
+            self._session.close()
+            self._session = None
 
     def __request_iyuu(self, url: str, method: str = "get", params: dict = None) -> Tuple[Optional[dict], str]:
         """
         向IYUUApi发送请求
         """
+        if not self._req:
+            self.init_config()
+        start_time = time.time()
         if method == "post":
-            ret = RequestUtils(
-                accept_type="application/json",
-                headers={'token': self._token}
-            ).post_res(f'{self._api_base + url}', json=params)
+            ret = self._req.post_res(f'{self._api_base + url}', json=params)
         else:
-            ret = RequestUtils(
-                accept_type="application/json",
-                headers={'token': self._token}
-            ).get_res(f'{self._api_base + url}', params=params)
+            ret = self._req.get_res(f'{self._api_base + url}', params=params)
         if ret:
             result = ret.json()
             if result.get('code') == 0:
-                return result.get('data'), ""
+                data, msg = result.get('data'), ""
             else:
-                return None, f'请求IYUU失败，状态码：{result.get("code")}，返回信息：{result.get("msg")}'
+                data, msg = None, f'请求IYUU失败，状态码：{result.get("code")}，返回信息：{result.get("msg")}'
         elif ret is not None:
-            return None, f"请求IYUU失败，状态码：{ret.status_code}，错误原因：{ret.reason}"
+            data, msg = None, f"请求IYUU失败，状态码：{ret.status_code}，错误原因：{ret.reason}"
         else:
-            return None, f"请求IYUU失败，未获取到返回信息"
+            data, msg = None, f"请求IYUU失败，未获取到返回信息"
+        self.__record(url=url, elapsed=time.time() - start_time, error=bool(msg))
+        return data, msg
+
+    def __record(self, url: str, elapsed: float, error: bool):
+        """
+        记录接口耗时及失败次数
+        """
+        with self._metrics_lock:
+            metric = self._metrics.setdefault(url, {"count": 0, "errors": 0, "time": 0.0, "max_time": 0.0})
+            metric["count"] += 1
+            metric["time"] += elapsed
+            metric["max_time"] = max(metric["max_time"], elapsed)
+            if error:
+                metric["errors"] += 1
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取接口统计
+        """
+        with self._metrics_lock:
+            return {url: dict(metric) for url, metric in self._metrics.items()}
 
     def get_torrent_url(self, sid: str) -> Tuple[Optional[str], Optional[str]]:
         if not sid:
@@ -59,21 +125,43 @@ class IyuuHelper(object):
         site = self._sites.get(sid)
         return site.get('base_url'), site.get('download_page')
 
+    def __load_sites_cache(self) -> Optional[dict]:
+        """
+        读取未过期的站点列表缓存
+        """
+        if not self._loader:
+            return None
+        cache = self._loader(self._sites_cache_key)
+        if not isinstance(cache, dict) or not cache.get("sites"):
+            return None
+        if (cache.get("time") or 0) + self._sites_cache_ttl < time.time():
+            return None
+        return cache
+
     def __get_sites(self) -> dict:
         """
-        返回支持辅种的全部站点
+        返回支持辅种的全部站点，优先使用缓存
         :return: 站点列表、错误信息
         """
-        result, msg = self.__request_iyuu(url='/reseed/sites/index')
-        if result:
-            ret_sites = {}
-            sites = result.get('sites')
-            for site in sites:
-                ret_sites[site.get('id')] = site
-            return ret_sites
+        cache = self.__load_sites_cache()
+        if cache:
+            sites = cache.get("sites")
+            self._sid_sha1 = self._sid_sha1 or cache.get("sid_sha1")
         else:
-            print(msg)
-            return {}
+            result, msg = self.__request_iyuu(url='/reseed/sites/index')
+            if not result:
+                print(msg)
+                return {}
+            sites = result.get('sites') or []
+            if self._saver:
+                self._saver(self._sites_cache_key, {
+                    "time": int(time.time()),
+                    "sites": sites
+                })
+        ret_sites = {}
+        for site in sites:
+            ret_sites[site.get('id')] = site
+        return ret_sites
 
     def __report_existing(self) -> Optional[str]:
         """
@@ -82,12 +170,19 @@ class IyuuHelper(object):
         """
         if not self._sites:
             self._sites = self.__get_sites()
+        if self._sid_sha1:
+            return self._sid_sha1
         sid_list = list(self._sites.keys())
         result, msg = self.__request_iyuu(url='/reseed/sites/reportExisting',
                                           method='post',
                                           params={'sid_list': sid_list})
         if result:
-            return result.get('sid_sha1')
+            sid_sha1 = result.get('sid_sha1')
+            cache = self.__load_sites_cache()
+            if cache and self._saver:
+                cache["sid_sha1"] = sid_sha1
+                self._saver(self._sites_cache_key, cache)
+            return sid_sha1
         return None
 
     def get_seed_info(self, info_hashs: list) -> Tuple[Optional[dict], str]:
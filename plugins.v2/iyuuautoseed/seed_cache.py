@@ -0,0 +1,183 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+
+class SeedCache(object):
+    """
+    辅种缓存，使用字典记录种子Hash及加入时间，支持过期和容量淘汰
+    持久化在插件数据目录的SQLite数据库中，每个条目一行，只回写有变动的条目
+    """
+
+    def __init__(self, name: str,
+                 db_path: Path,
+                 ttl: int = 0,
+                 max_size: int = 0):
+        """
+        :param name: 缓存名称，同一数据库中区分不同缓存
+        :param db_path: 数据库文件路径
+        :param ttl: 过期时间（秒），0为不过期
+        :param max_size: 最大条目数，0为不限制，超出时淘汰最早加入的条目
+        """
+        self._name = name
+        self._db_path = db_path
+        self._ttl = ttl
+        self._max_size = max_size
+        # {hash: 缓存值}，按加入时间先后排列
+        self._entries: Dict[str, Any] = {}
+        # 有变动待回写的条目，flush时存在的写入，不存在的删除
+        self._dirty: Set[str] = set()
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.__connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS seed_cache ("
+                         "name TEXT NOT NULL, "
+                         "hash TEXT NOT NULL, "
+                         "added INTEGER NOT NULL, "
+                         "value TEXT NOT NULL, "
+                         "PRIMARY KEY (name, hash))")
+
+    def __contains__(self, info_hash: str) -> bool:
+        value = self._entries.get(info_hash)
+        if value is None:
+            return False
+        if self._ttl and self._added(value) + self._ttl < time.time():
+            self.discard(info_hash)
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        打开数据库连接，正常退出时提交事务
+        """
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _added(value: Any) -> int:
+        """
+        缓存值的加入时间
+        """
+        return value
+
+    def load(self, legacy: Optional[Iterable[str]] = None):
+        """
+        从数据库加载缓存
+        :param legacy: 旧版本保存在配置中的缓存列表，合并后写入数据库
+        """
+        with self.__connect() as conn:
+            rows = conn.execute("SELECT hash, value FROM seed_cache WHERE name = ? ORDER BY added",
+                                (self._name,)).fetchall()
+        self._entries = {info_hash: json.loads(value) for info_hash, value in rows}
+        if legacy:
+            self.update(legacy)
+
+    def add(self, info_hash: str):
+        """
+        加入缓存，已存在时刷新加入时间
+        """
+        self._put(info_hash, int(time.time()))
+
+    def _put(self, info_hash: str, value: Any):
+        """
+        写入缓存值并移到末尾
+        """
+        if not info_hash:
+            return
+        self._entries.pop(info_hash, None)
+        self._entries[info_hash] = value
+        self._dirty.add(info_hash)
+
+    def update(self, info_hashs: Iterable[str]):
+        """
+        批量加入缓存
+        """
+        for info_hash in info_hashs:
+            self.add(info_hash)
+
+    def discard(self, info_hash: str):
+        """
+        移除缓存
+        """
+        if self._entries.pop(info_hash, None) is not None:
+            self._dirty.add(info_hash)
+
+    def clear(self):
+        """
+        清空缓存
+        """
+        self._dirty.update(self._entries)
+        self._entries = {}
+
+    def flush(self) -> int:
+        """
+        清理过期及超量条目，回写有变动的条目
+        :return: 回写的条目数
+        """
+        if self._ttl:
+            expire_time = time.time() - self._ttl
+            for info_hash in [info_hash for info_hash, value in self._entries.items()
+                              if self._added(value) < expire_time]:
+                self.discard(info_hash)
+        if self._max_size and len(self._entries) > self._max_size:
+            for info_hash in list(self._entries)[:len(self._entries) - self._max_size]:
+                self.discard(info_hash)
+        if not self._dirty:
+            return 0
+        upserts = []
+        deletes = []
+        for info_hash in self._dirty:
+            value = self._entries.get(info_hash)
+            if value is None:
+                deletes.append((self._name, info_hash))
+            else:
+                upserts.append((self._name, info_hash, self._added(value),
+                                json.dumps(value, ensure_ascii=False)))
+        with self.__connect() as conn:
+            conn.executemany("INSERT INTO seed_cache (name, hash, added, value) VALUES (?, ?, ?, ?) "
+                             "ON CONFLICT (name, hash) DO UPDATE SET added = excluded.added, value = excluded.value",
+                             upserts)
+            conn.executemany("DELETE FROM seed_cache WHERE name = ? AND hash = ?", deletes)
+        self._dirty = set()
+        return len(upserts) + len(deletes)
+
+
+class SeedInfoCache(SeedCache):
+    """
+    IYUU辅种查询结果缓存，记录每个种子Hash的查询时间及可辅种列表
+    """
+
+    @staticmethod
+    def _added(value: Any) -> int:
+        return value.get("time") or 0 if isinstance(value, dict) else 0
+
+    def get(self, info_hash: str) -> Optional[List[dict]]:
+        """
+        获取未过期的可辅种列表，未缓存时返回None
+        """
+        if info_hash not in self:
+            return None
+        return self._entries[info_hash].get("torrents") or []
+
+    def put(self, info_hash: str, torrents: List[dict]):
+        """
+        缓存查询结果，仅保留辅种需要的字段
+        """
+        self._put(info_hash, {
+            "time": int(time.time()),
+            "torrents": [{
+                "sid": torrent.get("sid"),
+                "torrent_id": torrent.get("torrent_id"),
+                "info_hash": torrent.get("info_hash")
+            } for torrent in torrents if isinstance(torrent, dict)]
+        })
@@ -0,0 +1,86 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Iterator, List, Optional, Tuple
+
+
+class SeedHistory(object):
+    """
+    辅种历史，保存在插件数据目录的SQLite数据库中，按源种子、下载器、站点建立索引
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        :param db_path: 数据库文件路径
+        """
+        self._db_path = db_path
+        self._lock = Lock()
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.__connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS seed_history ("
+                         "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "hash TEXT NOT NULL, "
+                         "downloader TEXT NOT NULL, "
+                         "target_hash TEXT NOT NULL, "
+                         "site TEXT, "
+                         "time INTEGER NOT NULL, "
+                         "UNIQUE (hash, downloader, target_hash))")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_seed_history_downloader "
+                         "ON seed_history (downloader, time)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_seed_history_site ON seed_history (site, time)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_seed_history_target ON seed_history (target_hash)")
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        打开数据库连接，正常退出时提交事务
+        """
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def add(self, records: List[dict]) -> int:
+        """
+        批量保存辅种记录，已存在的记录更新站点及时间
+        :param records: [{"hash": 源种子, "downloader": 下载器, "target_hash": 辅种种子, "site": 站点}]
+        :return: 保存的记录数
+        """
+        if not records:
+            return 0
+        now = int(time.time())
+        with self._lock, self.__connect() as conn:
+            conn.executemany("INSERT INTO seed_history (hash, downloader, target_hash, site, time) "
+                             "VALUES (?, ?, ?, ?, ?) "
+                             "ON CONFLICT (hash, downloader, target_hash) "
+                             "DO UPDATE SET site = excluded.site, time = excluded.time",
+                             [(record.get("hash"), record.get("downloader"), record.get("target_hash"),
+                               record.get("site"), record.get("time") or now) for record in records])
+        return len(records)
+
+    def query(self, hash_str: Optional[str] = None, downloader: Optional[str] = None,
+              site: Optional[str] = None, page: int = 1, count: int = 50) -> Tuple[int, List[dict]]:
+        """
+        分页查询辅种记录，按时间倒序
+        :return: 总数、当前页记录
+        """
+        conditions = []
+        params = []
+        for column, value in (("hash", hash_str), ("downloader", downloader), ("site", site)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        page = max(page, 1)
+        count = min(max(count, 1), 500)
+        with self.__connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM seed_history{where}", params).fetchone()[0]
+            rows = conn.execute(f"SELECT hash, downloader, target_hash, site, time FROM seed_history{where} "
+                                f"ORDER BY time DESC, id DESC LIMIT ? OFFSET ?",
+                                params + [count, (page - 1) * count]).fetchall()
+        return total, [dict(row) for row in rows]